@@ -0,0 +1,309 @@
+from collections import namedtuple
+from threading import Lock
+from time import perf_counter
+from types import MappingProxyType
+
+from backend.idle import IDLE_APP
+from backend.metrics import Metrics
+from backend.privacy import PrivacyMatcher
+
+# An immutable view of the totals as of delta number seq
+TimesSnapshot = namedtuple("TimesSnapshot", "seq app_times")
+
+
+def _ignore(*args):
+    pass
+
+
+class ActivityAccountant:
+    """Turns foreground snapshots into per-app time totals
+
+    This is the part of the tracker that decides what each second belongs
+    to: the app in front, Idle, or nothing (paused, private browsing, a
+    suspend gap). It holds no threads or timers; the loop driving it, be it
+    a polling thread, an event stream or an asyncio task, passes in
+    snapshots with timestamps from one monotonic timeline. Changes are
+    reported through the on_activity(app, title), on_delta(seq, changes)
+    and on_status(status) callbacks.
+
+    on_delta gets only the totals a credit touched, as ((app, total), ...),
+    numbered by a sequence that grows by one per delta; a consumer that sees
+    a jump resyncs from versioned_times(). on_times(app_times) still receives
+    a full copy on every credit for consumers that want one, at O(apps) cost.
+
+    The totals have a single writer, the thread driving the accountant.
+    Readers (saving, GUI resyncs, IPC queries) take snapshot(), an immutable
+    TimesSnapshot that is copied from the live dict only when something has
+    changed since the last one was taken, and never wait on the writer.
+    write_lock only orders the writer against settle() at shutdown.
+
+    Every credited span is also passed to each of `recorders` as
+    record(app, title, start, end): the day's SessionLog, TitleStats and
+    HourHistogram keep what the totals lose (sessions, titles, time of day).
+
+    The stages of a tick are timed into `metrics`: "privacy" (the privacy
+    check), "accumulate" (recorders and the totals update) and "emit" (the
+    delta and times callbacks, e.g. Qt signal emission).
+    """
+
+    def __init__(self, app_times=None, idle_detector=None,
+                 on_activity=None, on_times=None, on_status=None, on_delta=None,
+                 recorders=(), privacy=None, metrics=None):
+        self.app_times = app_times if app_times is not None else {}
+        self.idle_detector = idle_detector
+        self.on_activity = on_activity or _ignore
+        self.on_times = on_times or _ignore
+        self.on_delta = on_delta or _ignore
+        self.on_status = on_status or _ignore
+        self.recorders = list(recorders)
+        self.privacy = privacy or PrivacyMatcher()
+        self.metrics = metrics or Metrics("tick")
+        self.seq = 0
+        self.write_lock = Lock()
+        self._published = TimesSnapshot(None, MappingProxyType({}))
+        self.pause_tracking = False
+        self.private_browsing_active = False
+        self.idle_active = False
+        self.current_app = ""
+        self.current_window = ""
+        self.last_process = None
+        self.last_snapshot = None
+        self.last_time = 0.0
+        self.resumed_at = None
+
+    def start(self, current_time):
+        self.last_time = current_time
+
+    @property
+    def manually_paused(self):
+        return self.pause_tracking and not self.private_browsing_active
+
+    def is_private_browsing(self, window_title, app=None):
+        return self.privacy.is_private(window_title, app)
+
+    def snapshot(self):
+        """Latest TimesSnapshot; safe from any thread, never blocks the writer"""
+        published = self._published
+        seq = self.seq
+        if published.seq == seq:
+            return published
+        # seq is read before copying, so the copy is at least that new. It
+        # may already hold the next delta too, which is harmless: deltas
+        # carry absolute totals, so applying one twice changes nothing.
+        # Under the GIL dict.copy() of str keys runs without interruption.
+        published = TimesSnapshot(seq, MappingProxyType(self.app_times.copy()))
+        self._published = published
+        return published
+
+    def copy_times(self):
+        return dict(self.snapshot().app_times)
+
+    def versioned_times(self):
+        """(seq, totals copy) for a consumer (re)starting its delta stream"""
+        seq, app_times = self.snapshot()
+        return seq, dict(app_times)
+
+    def _set_total(self, app, total):
+        """Store and publish one total; returns the seconds spent publishing"""
+        self.app_times[app] = total
+        self.seq += 1
+        started = perf_counter()
+        self.on_delta(self.seq, ((app, total),))
+        if self.on_times is not _ignore:
+            self.on_times(self.app_times.copy())
+        emitted = perf_counter() - started
+        self.metrics.observe("emit", emitted)
+        return emitted
+
+    def credit(self, app, elapsed_time):
+        """Add elapsed_time (possibly negative) to app and publish the change"""
+        with self.write_lock:
+            return self._set_total(app, max(0, self.app_times.get(app, 0) + elapsed_time))
+
+    def credit_span(self, app, end_time):
+        """Credit app with the time from last_time to end_time (may be negative)"""
+        started = perf_counter()
+        self.record_span(app, end_time)
+        emitted = self.credit(app, end_time - self.last_time)
+        self.metrics.observe("accumulate", perf_counter() - started - emitted)
+
+    def record_span(self, app, end_time):
+        if self.recorders:
+            title = "" if app == IDLE_APP else self.current_window
+            for recorder in self.recorders:
+                try:
+                    recorder.record(app, title, self.last_time, end_time)
+                except Exception as e:
+                    # A day log must never stop the totals from being kept
+                    print(f"Error recording {recorder.folder}: {e}")
+
+    def toggle_pause(self):
+        self.pause_tracking = not self.pause_tracking
+        status = "paused" if self.pause_tracking else "resumed"
+        self.on_status(status)
+        return self.pause_tracking
+
+    def close_interval(self, current_time):
+        """Credit the app in front up to current_time, e.g. the moment a pause began"""
+        app = IDLE_APP if self.idle_active else self.last_process
+        if app:
+            self.credit_span(app, current_time)
+        self.last_time = current_time
+
+    def paused_tick(self, current_time):
+        """While paused the clock keeps moving but nothing is credited"""
+        self.last_time = current_time
+
+    def mark_gap(self, resume_time):
+        """The machine was suspended until resume_time: credit none of it"""
+        self.last_time = resume_time
+        self.last_snapshot = None
+        self.resumed_at = resume_time
+        for recorder in self.recorders:
+            recorder.resync_clock()
+
+    def check_idle(self, current_time):
+        """Update idle state; returns True while the user is away
+
+        On entering idle, time since the last input is moved from the app in
+        front to IDLE_APP. On leaving, idle is credited up to the moment of
+        the input that ended it.
+        """
+        if self.idle_detector is None:
+            return False
+
+        idle_seconds = self.idle_detector.idle_seconds()
+        if idle_seconds >= self.idle_detector.threshold:
+            if not self.idle_active:
+                idle_start = current_time - idle_seconds
+                if self.resumed_at is not None:
+                    # Input before a suspend gap doesn't reach across it
+                    idle_start = max(idle_start, self.resumed_at)
+                if self.last_process and not self.pause_tracking:
+                    self.credit_span(self.last_process, idle_start)
+                self.last_time = idle_start
+                self.idle_active = True
+                self.on_status("idle")
+            if not self.pause_tracking:
+                self.credit_span(IDLE_APP, current_time)
+            self.last_time = current_time
+            return True
+
+        if self.idle_active:
+            input_time = current_time - idle_seconds
+            if not self.pause_tracking:
+                self.credit_span(IDLE_APP, input_time)
+            self.last_time = input_time
+            self.idle_active = False
+            self.last_snapshot = None
+            self.on_status("active")
+        return False
+
+    def observe(self, snapshot, current_time):
+        """Account for one polled snapshot; returns True if anything changed"""
+        if snapshot == self.last_snapshot:
+            # Same window, pid and title as last tick: nothing to
+            # classify, just keep the clock running
+            self.advance(current_time)
+            return False
+        self.last_snapshot = snapshot
+        self.handle_snapshot(snapshot, current_time)
+        return True
+
+    def advance(self, current_time):
+        """Credit the app in front up to current_time"""
+        if self.last_process and not self.pause_tracking:
+            self.credit_span(self.last_process, current_time)
+        self.last_time = current_time
+
+    def handle_snapshot(self, snapshot, current_time):
+        """Account up to current_time, then switch to the window in snapshot"""
+        started = perf_counter()
+        private = self.privacy.is_private(snapshot.title, snapshot.process_name)
+        self.metrics.observe("privacy", perf_counter() - started)
+        if private:
+            if not self.private_browsing_active:
+                if self.last_process and not self.pause_tracking:
+                    self.credit_span(self.last_process, current_time)
+                self.pause_tracking = True
+                self.on_status("private_browsing_detected")
+                self.private_browsing_active = True
+            self.last_process = None
+            self.last_time = current_time
+            return
+        elif self.private_browsing_active:
+            self.pause_tracking = False
+            self.on_status("private_browsing_ended")
+            self.private_browsing_active = False
+
+        if self.last_process and not self.pause_tracking:
+            self.credit_span(self.last_process, current_time)
+
+        current_process = snapshot.process_name if snapshot.pid else None
+        if current_process and current_process != self.last_process:
+            self.on_activity(current_process, snapshot.title)
+            self.current_app = current_process
+        if current_process:
+            self.current_window = snapshot.title
+
+        self.last_process = current_process
+        self.last_time = current_time
+
+    def close_day(self, boundary):
+        """End the day at boundary (e.g. local midnight) and start the next from zero
+
+        The open interval is credited up to boundary, then every total is
+        published as 0 in one delta. Returns the finished day's totals.
+        """
+        app = IDLE_APP if self.idle_active else self.last_process
+        if app and not self.pause_tracking and boundary > self.last_time:
+            self.credit_span(app, boundary)
+        self.last_time = max(self.last_time, boundary)
+        finished = self.copy_times()
+        if finished:
+            self.app_times = {}
+            self.seq += 1
+            self.on_delta(self.seq, tuple((app, 0) for app in finished))
+            if self.on_times is not _ignore:
+                self.on_times({})
+        return finished
+
+    def settle(self, current_time):
+        """Credit the interval still open at shutdown and return the totals"""
+        with self.write_lock:
+            app = IDLE_APP if self.idle_active else self.last_process
+            if app and not self.pause_tracking:
+                self.record_span(app, current_time)
+                elapsed_time = current_time - self.last_time
+                self._set_total(app, self.app_times.get(app, 0) + elapsed_time)
+            self.last_time = current_time
+        return self.copy_times()
+
+
+class TimesMirror:
+    """Consumer-side copy of the totals, kept current by deltas
+
+        mirror.reset(*accountant.versioned_times())
+        if not mirror.apply(seq, changes):
+            mirror.reset(*accountant.versioned_times())   # missed one
+    """
+
+    def __init__(self):
+        self.app_times = {}
+        self.seq = None
+
+    def reset(self, seq, app_times):
+        self.seq = seq
+        self.app_times = dict(app_times)
+
+    def apply(self, seq, changes):
+        """Apply one delta; False if deltas were missed and a resync is due"""
+        if self.seq is None or seq <= self.seq:
+            # Not synced yet, or already covered by the last reset
+            return self.seq is not None
+        if seq != self.seq + 1:
+            return False
+        self.seq = seq
+        for app, total in changes:
+            self.app_times[app] = total
+        return True
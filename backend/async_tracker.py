@@ -0,0 +1,268 @@
+import asyncio
+import time
+from collections import namedtuple
+
+from time import perf_counter
+
+from backend.accounting import ActivityAccountant
+from backend.metrics import Metrics
+from backend.scheduling import AdaptiveInterval, TickScheduler
+from backend.engine import PAUSE_POLL, end_tick, share_metrics
+
+# kind is "activity" (data: (app, title)), "delta" (data: (seq, changes),
+# see ActivityAccountant) or "status" (data: status string)
+TrackerEvent = namedtuple("TrackerEvent", "kind data")
+
+
+class AsyncTracker:
+    """Tracker core where every job is a task on one asyncio event loop
+
+    Probing and accounting, periodic persistence, hotkeys and client
+    notifications all run on the loop's thread, so state changes happen in
+    a single, deterministic order without locks being contended. Blocking
+    file writes are the only thing handed to a worker thread.
+
+        tracker = AsyncTracker(probe, data_manager)
+        await tracker.run()                      # until stop()
+        await tracker.snapshot()                 # from another task
+        async for event in tracker.events(): ...
+    """
+
+    def __init__(self, probe, data_manager=None, sampler=None, idle_detector=None,
+                 ticker=None, save_interval=30.0, queue_size=256, hotkeys=False,
+                 day_logs=True):
+        self.probe = probe
+        self.data_manager = data_manager
+        self.sampler = sampler or AdaptiveInterval()
+        self.idle_detector = idle_detector
+        self.metrics = Metrics("tick")
+        share_metrics(probe, self.metrics)
+        self.ticker = ticker or TickScheduler(metrics=self.metrics)
+        self.save_interval = save_interval
+        self.queue_size = queue_size
+        self.hotkeys = hotkeys
+        self.subscribers = set()
+        self.loop = None
+        self._stop_event = None
+        self._wakeup = None
+        self._save_lock = None
+        self.day_end = data_manager.day_end() if data_manager else None
+
+        app_times = data_manager.get_today_data() if data_manager else {}
+        self.day_logs = {}
+        if data_manager and day_logs:
+            self.day_logs = data_manager.open_day_logs(clock=self.ticker.now)
+        self.accountant = ActivityAccountant(
+            app_times,
+            idle_detector=idle_detector,
+            on_activity=lambda app, title: self._publish("activity", (app, title)),
+            on_delta=lambda seq, changes: self._publish("delta", (seq, changes)),
+            on_status=lambda status: self._publish("status", status),
+            recorders=self.day_logs.values(),
+            privacy=data_manager.load_privacy_rules() if data_manager else None,
+            metrics=self.metrics,
+        )
+
+    def _publish(self, kind, data):
+        event = TrackerEvent(kind, data)
+        for queue in self.subscribers:
+            if queue.full():
+                # Slow subscriber: drop its oldest event rather than block us
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def events(self):
+        """Async iterator over activity, delta and status events
+
+        A full queue drops its oldest event, which shows up as a gap in the
+        delta seq; resync from accountant.versioned_times() when that happens.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.subscribers.discard(queue)
+
+    async def snapshot(self):
+        accountant = self.accountant
+        return {
+            "app_times": accountant.copy_times(),
+            "current_app": accountant.current_app,
+            "current_window": accountant.current_window,
+            "paused": accountant.pause_tracking,
+            "idle": accountant.idle_active,
+        }
+
+    def toggle_pause(self):
+        paused = self.accountant.toggle_pause()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return paused
+
+    async def pause(self):
+        if not self.accountant.pause_tracking:
+            self.toggle_pause()
+
+    async def resume(self):
+        if self.accountant.manually_paused:
+            self.toggle_pause()
+
+    async def save(self):
+        if self.data_manager is None:
+            return
+        async with self._save_lock:
+            snapshot = self.accountant.snapshot()
+            await asyncio.to_thread(self.data_manager.save_today_data, snapshot.app_times)
+            for log in list(self.day_logs.values()):
+                await asyncio.to_thread(self.data_manager.save_day_log, log)
+
+    async def check_day(self, current_time):
+        """Past local midnight, file the finished day and start the next one
+
+        Same as TrackingEngine.check_day(): the day is closed where midnight
+        fell on the tracker's timeline.
+        """
+        if self.data_manager is None:
+            return
+        wall = time.time()
+        if wall < self.day_end:
+            return
+        boundary = current_time - (wall - self.day_end)
+        async with self._save_lock:
+            finished = self.accountant.close_day(boundary)
+            await asyncio.to_thread(self.data_manager.save_today_data, finished)
+            for log in list(self.day_logs.values()):
+                await asyncio.to_thread(self.data_manager.save_day_log, log)
+            self.data_manager.start_day()
+            if self.day_logs:
+                self.day_logs = self.data_manager.open_day_logs(clock=self.ticker.now)
+                self.accountant.recorders = list(self.day_logs.values())
+        self.day_end = self.data_manager.day_end()
+
+    async def stop(self):
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def request_stop(self):
+        """Thread-safe stop request, e.g. from a signal handler or IPC"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._stop_event.set)
+
+    def tick_stats(self):
+        """Per-stage latency histograms and tick counters, as a plain dict"""
+        return self.metrics.snapshot()
+
+    def query_range(self, start_date, end_date):
+        """Corrected totals per date, with today's live totals in place of the last save"""
+        data = self.data_manager.get_range_data(start_date, end_date) if self.data_manager else {}
+        if self.data_manager:
+            today = self.data_manager.current_date
+            if start_date <= today <= end_date:
+                data[today] = self.data_manager.corrections.apply(today, self.accountant.copy_times())
+        return data
+
+    async def run(self):
+        """Run until stop() is called, then settle and save once"""
+        self.loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._save_lock = asyncio.Lock()
+        self.ticker.reset()
+        self.accountant.start(self.ticker.now())
+
+        tasks = [
+            asyncio.create_task(self._probe_loop()),
+            asyncio.create_task(self._persist_loop()),
+        ]
+        if self.hotkeys:
+            self._install_hotkeys()
+        try:
+            await self._stop_event.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.hotkeys:
+                self._remove_hotkeys()
+            self.accountant.settle(self.ticker.now())
+            await self.save()
+            self._publish("status", "stopped")
+
+    async def _sleep_tick(self, interval):
+        """Sleep to the next deadline; pause and resume cut the sleep short"""
+        delay = self.ticker.delay(interval)
+        if delay > 0:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+                self._wakeup.clear()
+                self.ticker.interrupted()
+            except asyncio.TimeoutError:
+                pass
+        tick = self.ticker.woke(interval)
+        if tick.gap:
+            self.accountant.mark_gap(tick.now)
+
+    async def _probe_loop(self):
+        accountant = self.accountant
+        paused = False
+        while True:
+            current_time = self.ticker.now()
+            await self.check_day(current_time)
+            if accountant.manually_paused:
+                if not paused:
+                    accountant.close_interval(current_time)
+                    paused = True
+                await self._sleep_tick(PAUSE_POLL)
+                accountant.paused_tick(self.ticker.now())
+                continue
+            paused = False
+            if accountant.check_idle(current_time):
+                await self._sleep_tick(self.idle_detector.idle_interval)
+                continue
+            started = perf_counter()
+            with self.metrics.timer("probe"):
+                snapshot = self.probe.snapshot()
+            changed = accountant.observe(snapshot, current_time)
+            end_tick(self.metrics, started)
+            await self._sleep_tick(self.sampler.next_interval(changed))
+
+    async def _persist_loop(self):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            try:
+                await self.save()
+            except Exception as e:
+                print(f"Error saving data: {e}")
+
+    def _install_hotkeys(self):
+        """keyboard calls back on its own hook thread; hop onto the loop"""
+        import keyboard
+
+        def on_loop(callback):
+            return lambda: self.loop.call_soon_threadsafe(callback)
+
+        try:
+            keyboard.add_hotkey('ctrl+shift+q', self.request_stop)
+            keyboard.add_hotkey('ctrl+p', on_loop(self.toggle_pause))
+            keyboard.add_hotkey('ctrl+r', on_loop(self.toggle_pause))
+        except Exception as e:
+            print(f"Hotkeys unavailable: {e}")
+
+    def _remove_hotkeys(self):
+        try:
+            import keyboard
+            keyboard.unhook_all_hotkeys()
+        except Exception:
+            pass
+
+
+def run_headless(probe, data_manager=None, **kwargs):
+    """Run an AsyncTracker on a fresh event loop until it is stopped"""
+    tracker = AsyncTracker(probe, data_manager, **kwargs)
+    try:
+        asyncio.run(tracker.run())
+    except KeyboardInterrupt:
+        pass
+    return tracker
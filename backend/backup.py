@@ -0,0 +1,271 @@
+import argparse
+import hashlib
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import Thread, Event
+
+from backend.fileio import write_atomic
+
+DEFAULT_DATA_DIR = Path.home() / "TimeTracker"
+# Per-day logs next to the totals: sessions, titles, hours, resources
+DAY_LOG_FOLDERS = ("sessions", "titles", "hours", "resources")
+
+
+class BackupError(Exception):
+    """Raised when a snapshot is missing or fails verification"""
+
+
+class BackupManager:
+    """Incremental, content-addressed snapshots of the tracking store
+
+    Each day in tracking_data.json is treated as one partition. A partition
+    is stored once under objects/ keyed by the SHA-256 of its canonical JSON,
+    and every snapshot is a small manifest mapping dates to object hashes.
+    Taking a backup therefore only writes the days that changed since the
+    previous snapshot. The correction log (corrections.jsonl) is stored the
+    same way as one more object, since compacting it rewrites the log, and
+    so is every per-day log file (sessions/<date>.json and the like).
+    """
+
+    def __init__(self, data_file=None, backup_dir=None):
+        self.data_file = Path(data_file) if data_file else DEFAULT_DATA_DIR / "tracking_data.json"
+        self.corrections_file = self.data_file.parent / "corrections.jsonl"
+        self.backup_dir = Path(backup_dir) if backup_dir else self.data_file.parent / "backups"
+        self.objects_dir = self.backup_dir / "objects"
+        self.snapshots_dir = self.backup_dir / "snapshots"
+
+    @staticmethod
+    def encode_partition(day_data):
+        """Canonical bytes for one day, stable across runs"""
+        return json.dumps(day_data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    def object_path(self, digest):
+        return self.objects_dir / digest[:2] / f"{digest}.json"
+
+    def list_snapshots(self):
+        """Snapshot ids, oldest first"""
+        if not self.snapshots_dir.exists():
+            return []
+        return sorted(p.stem for p in self.snapshots_dir.glob("*.json"))
+
+    def load_manifest(self, snapshot_id):
+        path = self.snapshots_dir / f"{snapshot_id}.json"
+        if not path.exists():
+            raise BackupError(f"Snapshot not found: {snapshot_id}")
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def latest_manifest(self):
+        snapshots = self.list_snapshots()
+        return self.load_manifest(snapshots[-1]) if snapshots else None
+
+    def day_log_files(self):
+        """Per-day log files under the data directory, keyed by '<folder>/<name>'"""
+        root = self.data_file.parent
+        return {f"{folder}/{path.name}": path
+                for folder in DAY_LOG_FOLDERS
+                for path in sorted((root / folder).glob("*.json"))}
+
+    def store_object(self, blob):
+        """Write blob under its digest unless it is already there. Returns (digest, written)"""
+        digest = hashlib.sha256(blob).hexdigest()
+        path = self.object_path(digest)
+        if path.exists():
+            return digest, False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, blob)
+        return digest, True
+
+    def read_object(self, digest, what):
+        """Verified bytes of a stored object; `what` names it in errors"""
+        path = self.object_path(digest)
+        if not path.exists():
+            raise BackupError(f"Missing {what} ({digest})")
+        blob = path.read_bytes()
+        if hashlib.sha256(blob).hexdigest() != digest:
+            raise BackupError(f"Corrupt {what} ({digest})")
+        return blob
+
+    def backup(self):
+        """Take a snapshot, writing only changed partitions. Returns the manifest"""
+        with open(self.data_file, 'r') as f:
+            all_data = json.load(f)
+
+        previous = self.latest_manifest()
+        previous_parts = previous["partitions"] if previous else {}
+
+        partitions = {}
+        written = 0
+        for date_str, day_data in all_data.items():
+            blob = self.encode_partition(day_data)
+            digest = hashlib.sha256(blob).hexdigest()
+            partitions[date_str] = digest
+            if previous_parts.get(date_str) == digest:
+                continue
+            path = self.object_path(digest)
+            if path.exists():
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, blob)
+            written += 1
+
+        corrections = None
+        if self.corrections_file.exists():
+            corrections, stored = self.store_object(self.corrections_file.read_bytes())
+            written += stored
+
+        day_logs = {}
+        for name, path in self.day_log_files().items():
+            day_logs[name], stored = self.store_object(path.read_bytes())
+            written += stored
+
+        if (previous and previous_parts == partitions
+                and previous.get("corrections") == corrections
+                and previous.get("day_logs") == day_logs):
+            return dict(previous, written=0)
+
+        snapshot_id = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        manifest = {
+            "id": snapshot_id,
+            "parent": previous["id"] if previous else None,
+            "created": time.time(),
+            "partitions": partitions,
+            "corrections": corrections,
+            "day_logs": day_logs,
+            "written": written,
+        }
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.snapshots_dir / f"{snapshot_id}.json",
+                           json.dumps(manifest, indent=2).encode("utf-8"))
+        return manifest
+
+    def read_snapshot(self, snapshot_id):
+        """Reassemble and verify the full store as of a snapshot"""
+        manifest = self.load_manifest(snapshot_id)
+        all_data = {}
+        for date_str, digest in manifest["partitions"].items():
+            path = self.object_path(digest)
+            if not path.exists():
+                raise BackupError(f"Missing partition {date_str} ({digest})")
+            blob = path.read_bytes()
+            if hashlib.sha256(blob).hexdigest() != digest:
+                raise BackupError(f"Corrupt partition {date_str} ({digest})")
+            all_data[date_str] = json.loads(blob)
+        return all_data
+
+    def read_corrections(self, snapshot_id):
+        """The snapshot's correction log as bytes, or None if it had none"""
+        digest = self.load_manifest(snapshot_id).get("corrections")
+        if digest is None:
+            return None
+        return self.read_object(digest, "correction log")
+
+    def read_day_logs(self, snapshot_id):
+        """The snapshot's per-day log files as {"<folder>/<name>": bytes}, or None
+
+        None means the snapshot was taken before day logs were backed up.
+        """
+        day_logs = self.load_manifest(snapshot_id).get("day_logs")
+        if day_logs is None:
+            return None
+        return {name: self.read_object(digest, f"day log {name}")
+                for name, digest in day_logs.items()}
+
+    def restore(self, snapshot_id, target=None):
+        """Verify a snapshot and atomically replace the data file, its correction log and day logs"""
+        all_data = self.read_snapshot(snapshot_id)
+        corrections = self.read_corrections(snapshot_id)
+        day_logs = self.read_day_logs(snapshot_id)
+        target = Path(target) if target else self.data_file
+        target.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(target, json.dumps(all_data, indent=2).encode("utf-8"))
+        corrections_target = target.parent / "corrections.jsonl"
+        if corrections is not None:
+            write_atomic(corrections_target, corrections)
+        elif target == self.data_file and corrections_target.exists():
+            corrections_target.unlink()  # the snapshot predates any correction
+        if day_logs is not None:
+            if target == self.data_file:
+                for name, path in self.day_log_files().items():
+                    if name not in day_logs:
+                        path.unlink()  # written after the snapshot
+            for name, blob in day_logs.items():
+                path = target.parent / name
+                path.parent.mkdir(exist_ok=True)
+                write_atomic(path, blob)
+        return all_data
+
+
+class BackupScheduler:
+    """Background thread that takes a backup every `interval` seconds"""
+
+    def __init__(self, manager, interval=3600):
+        self.manager = manager
+        self.interval = interval
+        self._stop = Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.manager.backup()
+            except Exception as e:
+                print(f"Error taking backup: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental backups of the TimeTracker store")
+    parser.add_argument("--data-file", help="tracking_data.json to back up")
+    parser.add_argument("--backup-dir", help="directory holding the snapshot chain")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backup", help="take a snapshot now")
+    sub.add_parser("list", help="list snapshots")
+    restore = sub.add_parser("restore", help="restore a snapshot")
+    restore.add_argument("snapshot", help="snapshot id, or 'latest'")
+    restore.add_argument("--target", help="write here instead of over the data file")
+    schedule = sub.add_parser("schedule", help="keep taking snapshots in the foreground")
+    schedule.add_argument("--interval", type=float, default=3600, help="seconds between snapshots")
+    args = parser.parse_args(argv)
+
+    manager = BackupManager(args.data_file, args.backup_dir)
+
+    if args.command == "backup":
+        manifest = manager.backup()
+        print(f"Snapshot {manifest['id']}: {len(manifest['partitions'])} days, "
+              f"{manifest['written']} written")
+    elif args.command == "list":
+        for snapshot_id in manager.list_snapshots():
+            manifest = manager.load_manifest(snapshot_id)
+            print(f"{snapshot_id}  {len(manifest['partitions'])} days  parent={manifest['parent']}")
+    elif args.command == "restore":
+        snapshot_id = args.snapshot
+        if snapshot_id == "latest":
+            snapshots = manager.list_snapshots()
+            if not snapshots:
+                parser.error("no snapshots to restore")
+            snapshot_id = snapshots[-1]
+        all_data = manager.restore(snapshot_id, args.target)
+        print(f"Restored {snapshot_id}: {len(all_data)} days")
+    elif args.command == "schedule":
+        scheduler = BackupScheduler(manager, args.interval)
+        scheduler.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import argparse
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+
+class SystemClock:
+    """The real clocks, plus the thread primitives that sleep on them
+
+    Everything in the backend that reads the time or waits takes a clock;
+    this is the default. VirtualClock has the same interface.
+    """
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.now()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def Event(self):
+        return threading.Event()
+
+    def Thread(self, target, name=None, daemon=True):
+        return threading.Thread(target=target, name=name, daemon=daemon)
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class _Waiter:
+    __slots__ = ("deadline", "event", "woken", "cond")
+
+    def __init__(self, deadline, event):
+        self.deadline = deadline
+        self.event = event
+        self.woken = False
+        self.cond = None  # only made if the thread actually has to block
+
+
+class VirtualEvent:
+    """threading.Event whose wait() timeout runs on a VirtualClock"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.flag = False
+
+    def is_set(self):
+        return self.flag
+
+    def set(self):
+        clock = self.clock
+        with clock.lock:
+            self.flag = True
+            for waiter in clock.waiters:
+                if waiter.event is self and not waiter.woken:
+                    clock._wake(waiter)
+
+    def clear(self):
+        self.flag = False
+
+    def wait(self, timeout=None):
+        return self.clock._wait(self, timeout)
+
+
+class VirtualClock:
+    """A clock that jumps ahead instead of waiting
+
+    Threads started with clock.Thread(), and the thread that created the
+    clock, take part in the simulation. Whenever all of them are blocked in
+    a sleep or an Event.wait, time jumps straight to the earliest deadline
+    and that waiter runs. Work between waits takes no virtual time, so a
+    month of ticks costs only the CPU time of the ticks themselves.
+
+    Each thread must only block through the clock (sleep, Event, join
+    after a stop); a thread stuck in real I/O stalls virtual time.
+    """
+
+    def __init__(self, start=None):
+        start = start or datetime(2024, 1, 1, 8, 0)
+        self.epoch = start.timestamp()
+        self.elapsed = 0.0
+        self.lock = threading.Lock()  # guards everything below
+        self.waiters = []
+        self.running = 1  # the creating thread
+
+    def monotonic(self):
+        return self.elapsed
+
+    def time(self):
+        return self.epoch + self.elapsed
+
+    def now(self):
+        return datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds):
+        self._wait(None, seconds)
+
+    def Event(self):
+        return VirtualEvent(self)
+
+    def Thread(self, target, name=None, daemon=True):
+        clock = self
+
+        class VirtualThread(threading.Thread):
+            def start(self):
+                with clock.lock:
+                    clock.running += 1
+                try:
+                    super().start()
+                except Exception:
+                    clock._detach()
+                    raise
+
+            def run(self):
+                try:
+                    super().run()
+                finally:
+                    clock._detach()
+
+        return VirtualThread(target=target, name=name, daemon=daemon)
+
+    def _wake(self, waiter):
+        # The woken thread counts as running from here, before it is
+        # scheduled, so nobody else advances time past its deadline
+        waiter.woken = True
+        self.running += 1
+        if waiter.cond is not None:
+            waiter.cond.notify()
+
+    def _detach(self):
+        with self.lock:
+            self.running -= 1
+            self._advance()
+
+    def _advance(self):
+        """With every thread blocked, jump to the earliest deadline"""
+        if self.running > 0:
+            return
+        deadlines = [w.deadline for w in self.waiters if not w.woken and w.deadline is not None]
+        if not deadlines:
+            return  # everyone waits forever: nothing left to simulate
+        self.elapsed = max(self.elapsed, min(deadlines))
+        for waiter in self.waiters:
+            if not waiter.woken and waiter.deadline is not None and waiter.deadline <= self.elapsed:
+                self._wake(waiter)
+
+    def _wait(self, event, timeout):
+        with self.lock:
+            if event is not None and event.flag:
+                return True
+            if timeout is not None and timeout <= 0:
+                return False
+            waiter = _Waiter(None if timeout is None else self.elapsed + timeout, event)
+            self.waiters.append(waiter)
+            self.running -= 1
+            self._advance()
+            if not waiter.woken:
+                # Its own condition on the clock's lock: waking one waiter
+                # doesn't stir every other sleeping thread
+                waiter.cond = threading.Condition(self.lock)
+                while not waiter.woken:
+                    waiter.cond.wait()
+            self.waiters.remove(waiter)
+            return event is not None and event.flag
+
+
+def simulate(days, save_interval=30.0, data_dir=None, start=None, trace_memory=False):
+    """Run the tracking engine for `days` of virtual time; returns a summary dict
+
+    trace_memory adds the peak traced allocation size (tracemalloc slows
+    the run down several times).
+    """
+    from backend.engine import TrackingEngine
+    from backend.idle import IdleDetector, FakeIdleSource
+    from backend.probes import SyntheticProbe
+    from backend.storage import DataManager
+
+    clock = VirtualClock(start)
+    # Nine hours of work in 36-minute cycles, then nothing in front until
+    # the next morning
+    cycle = [(1500, "code.exe", "engine.py - Visual Studio Code"),
+             (300, "chrome.exe", "Docs - Google Chrome"),
+             (120, "slack.exe", "general | Slack"),
+             (240, None, None)]
+    schedule = cycle * 15 + [(15 * 3600, None, None)]
+    with tempfile.TemporaryDirectory() as tmp:
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        engine = TrackingEngine(SyntheticProbe(schedule, clock=clock.monotonic, loop=True),
+                                data_manager=DataManager(data_dir or tmp, clock=clock),
+                                # never idle: away time is the schedule's no-window entry
+                                idle_detector=IdleDetector(FakeIdleSource(clock.monotonic),
+                                                           threshold=float("inf")),
+                                hotkeys=False, save_interval=save_interval,
+                                clock=clock)
+        engine.start_tracking()
+        clock.sleep(days * 86400)
+        engine.stop()
+        elapsed = time.perf_counter() - started
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        # Every day saved, not just the one still open
+        tracked = sum(sum(day.values()) for day in engine.data_manager.load_data().values())
+    summary = {"virtual_days": days, "wall_seconds": round(elapsed, 3),
+               "tracked_seconds": round(tracked), "credits": engine.accountant.seq,
+               "gaps": engine.ticker.gaps}
+    tick = engine.tick_stats()
+    summary["tick_p99_us"] = tick["histograms"]["tick"]["p99_us"]
+    summary["over_budget"] = tick["counters"].get("over_budget", 0)
+    if trace_memory:
+        summary["peak_memory_kb"] = peak // 1024
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate days of tracking on a virtual clock")
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--save-interval", type=float, default=30.0)
+    parser.add_argument("--trace-memory", action="store_true", help="report peak memory (slower)")
+    args = parser.parse_args(argv)
+    for key, value in simulate(args.days, args.save_interval, trace_memory=args.trace_memory).items():
+        print(f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import json
+import time
+from pathlib import Path
+
+from backend.fileio import write_atomic
+
+
+class CorrectionLog:
+    """Append-only log of edits to recorded time, applied at query time
+
+    Three kinds of entry, all keyed by date and app:
+      adjust    add (or with a negative value, remove) seconds
+      reassign  move seconds, or all of them, from one app to another
+      delete    drop an app from the day entirely
+
+    Recording an edit appends one JSON line and never rewrites the base
+    store. Entries are folded into the base data only by `compact`.
+
+    The entries are kept in memory keyed on the file's (mtime, size) and
+    reread when that changes, so a compaction or restore done by another
+    process is never applied twice on top of the data it folded.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.by_date = {}
+        self._key = None
+        self.refresh()
+
+    def _file_key(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self):
+        """Reread the log if the file changed since it was last read"""
+        key = self._file_key()
+        if key == self._key:
+            return
+        self.by_date = {}
+        self._key = key
+        if key is None:
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping malformed correction: {line[:80]}")
+                    continue
+                self.by_date.setdefault(entry["date"], []).append(entry)
+
+    def _append(self, entry):
+        self.refresh()
+        entry["ts"] = time.time()
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+        self.by_date.setdefault(entry["date"], []).append(entry)
+        self._key = self._file_key()
+        return entry
+
+    def adjust(self, date_str, app, seconds):
+        return self._append({"op": "adjust", "date": date_str, "app": app, "seconds": seconds})
+
+    def reassign(self, date_str, app, to_app, seconds=None):
+        """Move `seconds` (default: all) of app's time on date_str to to_app"""
+        return self._append({"op": "reassign", "date": date_str, "app": app,
+                             "to": to_app, "seconds": seconds})
+
+    def delete(self, date_str, app):
+        return self._append({"op": "delete", "date": date_str, "app": app})
+
+    def has_corrections(self, date_str):
+        self.refresh()
+        return date_str in self.by_date
+
+    def apply(self, date_str, day_data):
+        """Return day_data with this date's corrections applied, leaving it untouched"""
+        self.refresh()
+        entries = self.by_date.get(date_str)
+        if not entries:
+            return day_data
+        result = dict(day_data)
+        for entry in entries:
+            app = entry["app"]
+            op = entry["op"]
+            if op == "adjust":
+                result[app] = max(0, result.get(app, 0) + entry["seconds"])
+            elif op == "reassign":
+                available = result.get(app, 0)
+                moved = available if entry["seconds"] is None else min(entry["seconds"], available)
+                result[app] = available - moved
+                result[entry["to"]] = result.get(entry["to"], 0) + moved
+            elif op == "delete":
+                result.pop(app, None)
+            if result.get(app) == 0:
+                del result[app]
+        return result
+
+    def compact(self, all_data, keep_dates=()):
+        """Fold corrections into all_data in place and drop them from the log
+
+        Dates in keep_dates stay in the log unfolded, e.g. today, whose base
+        data is still being rewritten by the tracker.
+        """
+        self.refresh()
+        remaining = {}
+        for date_str, entries in self.by_date.items():
+            if date_str in keep_dates:
+                remaining[date_str] = entries
+                continue
+            folded = self.apply(date_str, all_data.get(date_str, {}))
+            if folded:
+                all_data[date_str] = folded
+            else:
+                all_data.pop(date_str, None)
+
+        lines = [json.dumps(entry) + "\n" for entries in remaining.values() for entry in entries]
+        write_atomic(self.path, "".join(lines).encode("utf-8"))
+        self.by_date = remaining
+        self._key = self._file_key()
+        return all_data
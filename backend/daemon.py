@@ -0,0 +1,166 @@
+import argparse
+import signal
+import sys
+from threading import Event
+
+from backend.storage import DataManager
+from backend.idle import IdleDetector
+
+
+def build_probe():
+    if sys.platform != "win32":
+        raise SystemExit("No activity probe for this platform; the tracker daemon needs Windows")
+    from backend.probes import WindowsProbe
+    return WindowsProbe()
+
+
+def install_signal_handlers(callback):
+    """Call callback() on SIGINT/SIGTERM (and Ctrl+Break on Windows)"""
+    signals = [signal.SIGINT, signal.SIGTERM]
+    if hasattr(signal, "SIGBREAK"):
+        signals.append(signal.SIGBREAK)
+    for signum in signals:
+        signal.signal(signum, lambda signum, frame: callback())
+
+
+def parse_address(value):
+    """host:port for TCP, anything else is a Unix socket path"""
+    host, sep, port = value.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return value
+
+
+def build_ipc_server(args):
+    if not args.ipc:
+        return None
+    from backend.ipc import IpcServer
+    return IpcServer(None, address=parse_address(args.ipc_address) if args.ipc_address else None)
+
+
+def run_threaded(args, data_manager, idle_detector):
+    from backend.engine import TrackingEngine
+
+    shutdown = Event()
+    server = build_ipc_server(args)
+
+    def on_status(status):
+        if server is not None:
+            server.publish_status(status)
+        if status == "stopped":
+            shutdown.set()
+
+    event_source = None
+    probe = build_probe()
+    if args.events:
+        from backend.events import WinEventSource
+        event_source = WinEventSource(probe)
+
+    engine = TrackingEngine(
+        probe,
+        data_manager=data_manager,
+        event_source=event_source,
+        idle_detector=idle_detector,
+        save_interval=args.save_interval,
+        hotkeys=args.hotkeys,
+        resource_interval=args.resources,
+        record_to=args.record,
+        metrics_interval=args.metrics,
+        on_activity=server.publish_activity if server is not None else None,
+        on_delta=server.publish_delta if server is not None else None,
+        on_status=on_status,
+    )
+    install_signal_handlers(shutdown.set)
+    if server is not None:
+        server.controller = engine
+        server.app_times = engine.accountant.copy_times()
+        server.start_in_thread()
+    engine.start_tracking()
+    # Waiting with a timeout keeps the main thread responsive to signals
+    while not shutdown.wait(1.0):
+        pass
+    engine.stop()
+    if server is not None:
+        server.stop_thread()
+
+
+def run_asyncio(args, data_manager, idle_detector):
+    import asyncio
+    from backend.async_tracker import AsyncTracker
+
+    tracker = AsyncTracker(
+        build_probe(),
+        data_manager,
+        idle_detector=idle_detector,
+        save_interval=args.save_interval,
+        hotkeys=args.hotkeys,
+    )
+
+    server = build_ipc_server(args)
+
+    async def forward(events):
+        # Same loop as the server, so no thread hop is needed
+        async for event in events:
+            if event.kind == "delta":
+                server._on_delta(event.data[1])
+            elif event.kind == "activity":
+                server._on_activity(*event.data)
+            else:
+                server._on_status(event.data)
+
+    async def main():
+        install_signal_handlers(tracker.request_stop)
+        forwarder = None
+        if server is not None:
+            server.controller = tracker
+            server.app_times = tracker.accountant.copy_times()
+            await server.start()
+            forwarder = asyncio.create_task(forward(tracker.events()))
+        try:
+            await tracker.run()
+        finally:
+            if server is not None:
+                await asyncio.sleep(0.1)  # let the final "stopped" status reach clients
+                forwarder.cancel()
+                await server.close()
+
+    asyncio.run(main())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless TimeTracker daemon")
+    parser.add_argument("--engine", choices=["threads", "asyncio"], default="threads")
+    parser.add_argument("--events", action="store_true",
+                        help="use WinEvent foreground hooks instead of polling (threads engine)")
+    parser.add_argument("--save-interval", type=float, default=30.0, help="seconds between saves")
+    parser.add_argument("--idle-threshold", type=float, default=300.0,
+                        help="seconds without input before time counts as idle (0 disables)")
+    parser.add_argument("--no-hotkeys", dest="hotkeys", action="store_false",
+                        help="don't register the global pause/stop hotkeys")
+    parser.add_argument("--resources", type=float, metavar="SECONDS",
+                        help="sample CPU/memory of the app in front every SECONDS (threads engine)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="log the tracker's inputs to PATH (.gz to compress) for "
+                             "python -m backend.replay (threads engine)")
+    parser.add_argument("--metrics", type=float, metavar="SECONDS",
+                        help="print tick latency per stage every SECONDS (threads engine)")
+    parser.add_argument("--no-ipc", dest="ipc", action="store_false",
+                        help="don't serve tracker state to local clients")
+    parser.add_argument("--ipc-address", help="Unix socket path or host:port for the IPC server")
+    args = parser.parse_args(argv)
+
+    data_manager = DataManager()
+    idle_detector = None
+    if args.idle_threshold > 0:
+        idle_detector = IdleDetector.default()
+        if idle_detector is not None:
+            idle_detector.threshold = args.idle_threshold
+
+    if args.engine == "asyncio":
+        run_asyncio(args, data_manager, idle_detector)
+    else:
+        run_threaded(args, data_manager, idle_detector)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+from threading import Lock
+from time import perf_counter
+
+from backend.clock import SYSTEM_CLOCK
+from backend.storage import DataManager
+from backend.accounting import ActivityAccountant
+from backend.events import WAKEUP
+from backend.probes import WindowsProbe
+from backend.scheduling import AdaptiveInterval, TickScheduler
+from backend.idle import IdleDetector
+from backend.metrics import Metrics, MetricsReporter
+from backend.replay import RecordingAccountant
+
+# While paused the loop sleeps until woken by resume or stop; this is only
+# a safety net in case a wake-up is ever missed
+PAUSE_POLL = 60.0
+
+# A tick's own work (probe, privacy, accounting, emit) should stay under this
+TICK_BUDGET = 0.001
+
+# idle_detector's default: the platform's detector. An explicit None means
+# idle detection is off.
+DEFAULT_IDLE_DETECTOR = object()
+
+
+def share_metrics(probe, metrics):
+    """Have a probe that times its own stages (WindowsProbe) report into metrics"""
+    if probe is not None and getattr(probe, "metrics", None) is not None:
+        probe.metrics = metrics
+
+
+def end_tick(metrics, started):
+    """Account a tick's work, from started (perf_counter) until now"""
+    elapsed = perf_counter() - started
+    metrics.observe("tick", elapsed)
+    if elapsed > TICK_BUDGET:
+        metrics.incr("over_budget")
+
+
+class TrackingEngine:
+    """Threaded tracking engine with no GUI dependency
+
+    Runs the probe (or event) loop, the global hotkeys and periodic
+    persistence on plain threads and reports changes through callbacks:
+    on_activity(app, title), on_delta(seq, changes), on_times(app_times)
+    and on_status(status); see ActivityAccountant for the delta stream.
+    The Qt BackendTracker and the headless daemon are both thin shells
+    around it.
+
+    Every clock read, sleep and thread goes through `clock`, so a
+    VirtualClock (backend.clock) can run days of tracking without waiting
+    them out (about two seconds of CPU per virtual day).
+
+    Each tick is timed into `metrics` (see tick_stats()): the whole tick,
+    each stage of it, how late it woke ("jitter") and how many ticks went
+    over TICK_BUDGET. With metrics_interval set, a summary is printed
+    every metrics_interval seconds.
+
+    idle_detector defaults to the platform's detector; pass None to turn
+    idle detection off.
+
+    At local midnight the finished day's totals and logs are saved under
+    its date and tracking carries on into the next day from zero (see
+    check_day()).
+    """
+
+    def __init__(self, probe=None, data_manager=None, event_source=None, refresh_interval=5.0,
+                 sampler=None, idle_detector=DEFAULT_IDLE_DETECTOR, ticker=None, save_interval=30.0,
+                 hotkeys=True, on_activity=None, on_times=None, on_status=None,
+                 on_delta=None, day_logs=True, resource_interval=None, record_to=None,
+                 clock=None, metrics_interval=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.metrics = Metrics("tick")
+        self.probe = probe or (None if event_source is not None else WindowsProbe(metrics=self.metrics))
+        share_metrics(self.probe, self.metrics)
+        share_metrics(getattr(event_source, "probe", None), self.metrics)
+        self.data_manager = data_manager or DataManager(clock=self.clock)
+        self.event_source = event_source
+        self.refresh_interval = refresh_interval
+        self.sampler = sampler or AdaptiveInterval()
+        if idle_detector is DEFAULT_IDLE_DETECTOR:
+            idle_detector = IdleDetector.default()
+        self.idle_detector = idle_detector
+        self.wakeup = self.clock.Event()
+        self.ticker = ticker or TickScheduler(clock=self.clock.monotonic, sleep=self.sleep,
+                                              metrics=self.metrics)
+        self.save_interval = save_interval
+        self.hotkeys = hotkeys
+        self.on_status = on_status or (lambda status: None)
+        self.stop_tracking = False
+        self.stopped = self.clock.Event()
+        self.threads = []
+        self.tracking_thread = self.persist_thread = None
+        self.saved_seq = None
+        self.save_lock = Lock()  # a save never straddles a day change
+        self.day_end = self.data_manager.day_end()
+        # Sessions, title stats and hour-of-day histograms for today
+        self.day_logs = self.data_manager.open_day_logs(clock=self.now) if day_logs else {}
+        self.accountant = ActivityAccountant(
+            self.data_manager.get_today_data(),  # Load today's data
+            idle_detector=self.idle_detector,
+            on_activity=on_activity,
+            on_times=on_times,
+            on_status=self.on_status,
+            on_delta=on_delta,
+            recorders=self.day_logs.values(),
+            privacy=self.data_manager.load_privacy_rules(),
+            metrics=self.metrics,
+        )
+        if record_to:
+            # Log every accountant input for backend.replay
+            self.accountant = RecordingAccountant(self.accountant, record_to, clock=self.now)
+        self.accountant.start(self.now())
+        self.foreground = None
+        self.resource_sampler = None
+        if resource_interval:
+            self.resource_sampler = self.data_manager.open_resource_sampler(resource_interval)
+        self.reporter = MetricsReporter(self.metrics, metrics_interval) if metrics_interval else None
+
+    @property
+    def app_times(self):
+        return self.accountant.app_times
+
+    def auto_save(self):
+        """Auto-save current data"""
+        with self.save_lock:
+            snapshot = self.accountant.snapshot()
+            if snapshot.seq == self.saved_seq:
+                return  # nothing credited since the last save
+            self.data_manager.save_today_data(snapshot.app_times)
+            self.saved_seq = snapshot.seq
+            self.save_extras()
+
+    def save_extras(self):
+        """Flush the day logs alongside the totals"""
+        for log in self.day_logs.values():
+            self.data_manager.save_day_log(log)
+        if self.resource_sampler is not None:
+            self.data_manager.save_day_log(self.resource_sampler.stats)
+
+    def persist_loop(self):
+        """Save every save_interval seconds until stopped"""
+        while not self.stopped.wait(self.save_interval):
+            try:
+                self.auto_save()
+            except Exception as e:
+                print(f"Error saving data: {e}")
+
+    def listen_for_shortcuts(self):
+        try:
+            import keyboard
+            keyboard.add_hotkey('ctrl+shift+q', self.request_stop)
+            keyboard.add_hotkey('ctrl+p', self.toggle_pause)
+            keyboard.add_hotkey('ctrl+r', self.toggle_pause)
+            keyboard.wait()
+        except:
+            pass
+
+    def now(self):
+        """Current time on the tracker's monotonic timeline"""
+        if self.event_source is not None:
+            return self.event_source.now()
+        return self.ticker.now()
+
+    def check_day(self, current_time):
+        """Past local midnight, file the finished day and start the next one
+
+        current_time is the tick's time on the tracker's timeline; the day
+        is closed where midnight fell on it, so no span crosses into the
+        next day's totals or logs.
+        """
+        wall = self.clock.time()
+        if wall < self.day_end:
+            return
+        boundary = current_time - (wall - self.day_end)
+        with self.save_lock:
+            finished = self.accountant.close_day(boundary)
+            self.data_manager.save_today_data(finished)
+            self.save_extras()
+            self.data_manager.start_day()
+            if self.day_logs:
+                self.day_logs = self.data_manager.open_day_logs(clock=self.now)
+                self.accountant.recorders = list(self.day_logs.values())
+            if self.resource_sampler is not None:
+                self.resource_sampler.stats = self.data_manager.open_resource_stats()
+            self.saved_seq = None
+        self.day_end = self.data_manager.day_end()
+
+    def sample_resources(self, current_time):
+        """Let the resource sampler (if any) read the process being tracked"""
+        accountant = self.accountant
+        if (self.resource_sampler is None or self.foreground is None
+                or accountant.pause_tracking or accountant.idle_active or not accountant.last_process):
+            return
+        self.resource_sampler.sample(accountant.last_process, self.foreground.pid, current_time)
+
+    def sleep(self, seconds):
+        """Interruptible sleep: returns True if woken early by pause, resume or stop"""
+        woken = self.wakeup.wait(seconds)
+        self.wakeup.clear()
+        return woken
+
+    def tick_stats(self):
+        """Per-stage latency histograms and tick counters, as a plain dict"""
+        return self.metrics.snapshot()
+
+    def wait_tick(self, interval):
+        """Sleep until the next tick deadline, dropping suspend gaps"""
+        tick = self.ticker.wait(interval)
+        if tick.gap:
+            # Suspended or frozen: the missing time belongs to no app
+            self.accountant.mark_gap(tick.now)
+
+    def track_active_window(self):
+        accountant = self.accountant
+        self.ticker.reset()
+        accountant.start(self.ticker.now())
+        paused = False
+        try:
+            while not self.stop_tracking:
+                started = perf_counter()
+                current_time = self.ticker.now()
+                self.check_day(current_time)
+
+                if accountant.manually_paused:
+                    if not paused:
+                        # The pause woke us: the time up to now still counts
+                        accountant.close_interval(current_time)
+                        paused = True
+                    # Nothing is credited while paused: sleep until woken,
+                    # then restart the clock from the moment of waking
+                    self.wait_tick(PAUSE_POLL)
+                    accountant.paused_tick(self.ticker.now())
+                    continue
+                paused = False
+
+                if accountant.check_idle(current_time):
+                    end_tick(self.metrics, started)
+                    self.wait_tick(self.idle_detector.idle_interval)
+                    continue
+
+                with self.metrics.timer("probe"):
+                    self.foreground = self.probe.snapshot()
+                changed = accountant.observe(self.foreground, current_time)
+                self.sample_resources(current_time)
+                end_tick(self.metrics, started)
+                self.wait_tick(self.sampler.next_interval(changed))
+        except Exception as e:
+            print(f"Tracking error: {e}")
+
+    def handle_event(self, event):
+        """Account for a foreground event using its timestamp as the switch boundary"""
+        self.foreground = event.snapshot
+        self.accountant.handle_snapshot(event.snapshot, event.timestamp)
+
+    def track_events(self):
+        """Event-driven tracking loop
+
+        Sleeps until the event source reports a foreground or title change.
+        While nothing happens it wakes every refresh_interval seconds only to
+        publish the running total of the current app.
+        """
+        accountant = self.accountant
+        source = self.event_source
+        source.start()
+        last_wake = self.ticker.now()
+        paused = False
+        try:
+            while not self.stop_tracking:
+                timeout = self.idle_detector.idle_interval if accountant.idle_active else self.refresh_interval
+                event = source.get(timeout=timeout)
+
+                # get() blocks for at most timeout, so waking much later
+                # than that means the machine was suspended
+                wake = self.ticker.now()
+                if self.ticker.is_gap(wake - last_wake, timeout):
+                    accountant.mark_gap(event.timestamp if event is not None else source.now())
+                last_wake = wake
+                self.check_day(event.timestamp if event is not None else source.now())
+
+                started = perf_counter()
+                if event is not None and event.kind == WAKEUP:
+                    # Pause or resume: everything queued before it is
+                    # accounted, so the switch happens at its timestamp
+                    if accountant.manually_paused and not paused:
+                        accountant.close_interval(event.timestamp)
+                        paused = True
+                    elif not accountant.manually_paused and paused:
+                        accountant.paused_tick(event.timestamp)
+                        paused = False
+                    continue
+                if event is not None:
+                    if accountant.idle_active:
+                        accountant.check_idle(event.timestamp)
+                    self.handle_event(event)
+                    end_tick(self.metrics, started)
+                    continue
+                if source.closed:
+                    break
+
+                current_time = source.now()
+                if accountant.check_idle(current_time):
+                    end_tick(self.metrics, started)
+                    continue
+                accountant.advance(current_time)
+                self.sample_resources(current_time)
+                end_tick(self.metrics, started)
+        except Exception as e:
+            print(f"Tracking error: {e}")
+        finally:
+            source.close()
+
+    def _spawn(self, target):
+        thread = self.clock.Thread(target=target, name=target.__name__)
+        thread.start()
+        self.threads.append(thread)
+        return thread
+
+    def start_tracking(self):
+        if self.hotkeys:
+            self.shortcut_thread = self._spawn(self.listen_for_shortcuts)
+
+        if self.event_source is not None:
+            self.tracking_thread = self._spawn(self.track_events)
+        else:
+            self.tracking_thread = self._spawn(self.track_active_window)
+
+        if self.save_interval:
+            self.persist_thread = self._spawn(self.persist_loop)
+
+        if self.reporter is not None:
+            self.reporter.start()
+
+        # Emit initial data
+        self.accountant.on_times(self.accountant.copy_times())
+
+    def toggle_pause(self):
+        self.accountant.toggle_pause()
+        self.wakeup.set()
+        if self.event_source is not None:
+            self.event_source.wake()
+
+    def pause(self):
+        if not self.accountant.pause_tracking:
+            self.toggle_pause()
+
+    def resume(self):
+        if self.accountant.manually_paused:
+            self.toggle_pause()
+
+    def request_stop(self):
+        """Ask whoever owns the engine to shut down (hotkey, IPC)"""
+        self.stop_tracking = True
+        self.wakeup.set()
+        self.on_status("stopped")
+
+    def query_range(self, start_date, end_date):
+        """Corrected totals per date, with today's live totals in place of the last save"""
+        data = self.data_manager.get_range_data(start_date, end_date)
+        today = self.data_manager.current_date
+        if start_date <= today <= end_date:
+            data[today] = self.data_manager.corrections.apply(today, self.accountant.copy_times())
+        return data
+
+    def stop(self, timeout=5.0):
+        """Stop the loops, wait for them to exit, then credit and save once
+
+        The tracking thread is woken rather than waited out, so this returns
+        within milliseconds unless a probe call is hanging. The open interval
+        is credited by settle() only after the thread has exited, so it is
+        counted exactly once.
+        """
+        self.stop_tracking = True
+        self.stopped.set()
+        self.wakeup.set()
+        if self.event_source is not None:
+            self.event_source.close()
+        for thread in (self.tracking_thread, self.persist_thread):
+            if thread is not None:
+                thread.join(timeout)
+                if thread.is_alive():
+                    print(f"Warning: {thread.name} did not stop within {timeout}s")
+        if self.reporter is not None:
+            self.reporter.stop()
+        app_times = self.accountant.settle(self.now())  # also closes a recording
+        self.data_manager.save_today_data(app_times)
+        self.save_extras()
@@ -0,0 +1,182 @@
+import time
+from collections import namedtuple
+from queue import Queue, Empty
+from threading import Thread, Event
+
+from backend.probes import WindowsProbe
+
+FOREGROUND_CHANGED = "foreground_changed"
+TITLE_CHANGED = "title_changed"
+WAKEUP = "wakeup"
+
+# kind is FOREGROUND_CHANGED or TITLE_CHANGED, snapshot a ForegroundSnapshot
+# taken when the event fired, timestamp in the same clock the source's now()
+# reports. WAKEUP events carry no snapshot: they only wake the consumer, e.g.
+# on pause or resume, in order with the events queued before them.
+ForegroundEvent = namedtuple("ForegroundEvent", "timestamp kind snapshot")
+
+
+class EventSource:
+    """Stream of foreground events consumed by the tracker
+
+    Events are queued by the source and pulled with get(). `closed` is set
+    once the source will never produce another event.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.queue = Queue()
+        self.closed = False
+
+    def start(self):
+        pass
+
+    def close(self):
+        self.closed = True
+        # Wake a consumer blocked in get(); it sees None and checks closed
+        self.queue.put(None)
+
+    def now(self):
+        return self.clock()
+
+    def wake(self):
+        """Wake a consumer blocked in get() with a WAKEUP event stamped now"""
+        self.queue.put(ForegroundEvent(self.now(), WAKEUP, None))
+
+    def get(self, timeout=None):
+        """Next event, or None if nothing arrived within timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+
+class SimulatedEventSource(EventSource):
+    """Replays a fixed list of ForegroundEvents, e.g. in tests
+
+    now() is the timestamp of the last delivered event, so time accounting
+    stays on the simulated timeline.
+    """
+
+    def __init__(self, events):
+        super().__init__()
+        self.last_timestamp = None
+        for event in events:
+            self.queue.put(event)
+
+    def now(self):
+        return self.last_timestamp if self.last_timestamp is not None else 0.0
+
+    def get(self, timeout=None):
+        try:
+            event = self.queue.get_nowait()
+        except Empty:
+            event = None
+        if event is None:
+            self.closed = True
+            return None
+        self.last_timestamp = event.timestamp
+        return event
+
+
+class PollingEventSource(EventSource):
+    """Low-rate polling fallback that turns probe snapshots into events"""
+
+    def __init__(self, probe, interval=5.0, clock=time.monotonic):
+        super().__init__(clock)
+        self.probe = probe
+        self.interval = interval
+        self._stop = Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        super().close()
+
+    def _run(self):
+        last = None
+        while not self._stop.is_set():
+            snapshot = self.probe.snapshot()
+            if last is None or (snapshot.hwnd, snapshot.pid) != (last.hwnd, last.pid):
+                self.queue.put(ForegroundEvent(self.clock(), FOREGROUND_CHANGED, snapshot))
+            elif snapshot.title != last.title:
+                self.queue.put(ForegroundEvent(self.clock(), TITLE_CHANGED, snapshot))
+            last = snapshot
+            self._stop.wait(self.interval)
+
+
+class WinEventSource(EventSource):
+    """Foreground and title-change events from a SetWinEventHook hook
+
+    The hook runs out of context on its own thread with a message loop, so
+    nothing is polled; the callback only snapshots the new foreground window
+    and queues it.
+    """
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    WM_QUIT = 0x0012
+
+    def __init__(self, probe=None):
+        super().__init__()
+        self.probe = probe or WindowsProbe()
+        self._thread = None
+        self._thread_id = None
+
+    def start(self):
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        if self._thread_id:
+            import ctypes
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+        super().close()
+
+    def _run(self):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+
+        def callback(hook, event, hwnd, id_object, id_child, thread_id, event_time):
+            if event == self.EVENT_OBJECT_NAMECHANGE:
+                if id_object != self.OBJID_WINDOW or hwnd != user32.GetForegroundWindow():
+                    return
+                kind = TITLE_CHANGED
+            else:
+                kind = FOREGROUND_CHANGED
+            self.queue.put(ForegroundEvent(self.clock(), kind, self.probe.snapshot()))
+
+        proc = WinEventProc(callback)
+        flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+        hooks = [
+            user32.SetWinEventHook(event, event, 0, proc, 0, 0, flags)
+            for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE)
+        ]
+        self._thread_id = kernel32.GetCurrentThreadId()
+
+        # Whatever is in front when we start counts as the first switch
+        self.queue.put(ForegroundEvent(self.clock(), FOREGROUND_CHANGED, self.probe.snapshot()))
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+        for hook in hooks:
+            if hook:
+                user32.UnhookWinEvent(hook)
+        self.closed = True
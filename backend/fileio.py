@@ -0,0 +1,36 @@
+import json
+import os
+
+
+def write_atomic(path, raw, metrics=None):
+    """Replace path with the bytes raw, so readers see the old file or the new one
+
+    The bytes go to a ".tmp" sibling that is fsynced and then renamed over
+    path. With `metrics`, file opens and fsyncs are counted and the fsync
+    is timed.
+    """
+    # A plain string: Path parsing interns the name, and a fresh name per
+    # save churns the interpreter's intern table
+    tmp_path = os.fspath(path) + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        if metrics is not None:
+            metrics.incr("file_opens")
+        f.write(raw)
+        f.flush()
+        if metrics is not None:
+            with metrics.timer("fsync"):
+                os.fsync(f.fileno())
+            metrics.incr("fsyncs")
+        else:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_json(path, data):
+    """write_atomic() of data as compact UTF-8 JSON"""
+    write_atomic(path, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def read_json(path):
+    with open(path, 'rb') as f:
+        return json.loads(f.read())
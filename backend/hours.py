@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import numpy as np
+
+from backend.idle import IDLE_APP
+from backend.scheduling import DayClock
+
+DAY_SECONDS = 24 * 3600
+BUCKETS = 96  # 15-minute buckets
+
+
+class HourHistogram:
+    """When in the day each app was used: one time-of-day array per app
+
+    Each app has a NumPy array of BUCKETS seconds-used counters covering
+    the day. A tick's span normally falls in one bucket (two when it
+    crosses a boundary), so recording is O(1); hour-of-day charts and peak
+    hours are then simple reductions over the arrays.
+    """
+
+    folder = "hours"
+
+    def __init__(self, date_str, day_clock=None, buckets=BUCKETS):
+        self.date_str = date_str
+        self.day_clock = day_clock or DayClock(date_str)
+        self.buckets = buckets
+        self.bucket_seconds = DAY_SECONDS / buckets
+        self.apps = {}
+        self.dirty = False
+
+    def resync_clock(self):
+        self.day_clock.resync()
+
+    def _row(self, app):
+        row = self.apps.get(app)
+        if row is None:
+            row = self.apps[app] = np.zeros(self.buckets)
+        return row
+
+    def record(self, app, title, start, end):
+        """Add the span start..end (monotonic) to app; a negative span takes time back"""
+        a, b = self.day_clock.seconds(start), self.day_clock.seconds(end)
+        sign = 1.0
+        if b < a:
+            a, b, sign = b, a, -1.0
+        a, b = max(a, 0.0), min(b, float(DAY_SECONDS))
+        if a >= b:
+            return
+        row = self._row(app)
+        width = self.bucket_seconds
+        while a < b:
+            i = min(int(a // width), self.buckets - 1)
+            edge = min(b, (i + 1) * width)
+            row[i] = max(0.0, row[i] + sign * (edge - a))
+            a = edge
+        self.dirty = True
+
+    def hourly(self, app=None):
+        """Seconds per hour of the day (24 values), for one app or all but Idle"""
+        if app is not None:
+            row = self.apps.get(app)
+            if row is None:
+                return np.zeros(24)
+        else:
+            row = self.total()
+        return row.reshape(24, -1).sum(axis=1)
+
+    def total(self, include_idle=False):
+        """Per-bucket seconds summed over apps"""
+        rows = [row for app, row in list(self.apps.items()) if include_idle or app != IDLE_APP]
+        if not rows:
+            return np.zeros(self.buckets)
+        return np.sum(rows, axis=0)
+
+    def peak_hour(self, app=None):
+        """Hour of the day (0-23) with the most use, or None if nothing was used"""
+        hours = self.hourly(app)
+        return int(hours.argmax()) if hours.any() else None
+
+    def to_json(self):
+        return {"format": "timetracker-hours", "date": self.date_str, "buckets": self.buckets,
+                "apps": {app: np.round(row, 3).tolist() for app, row in list(self.apps.items())}}
+
+    @classmethod
+    def from_json(cls, data, **kwargs):
+        histogram = cls(data["date"], buckets=data["buckets"], **kwargs)
+        histogram.apps = {app: np.array(row, dtype=float) for app, row in data["apps"].items()}
+        return histogram
+
+
+def weekday_hour_matrix(histograms, app=None, include_idle=False):
+    """7 x 24 seconds of use by day of week (Monday = 0) and hour
+
+    histograms is any iterable of HourHistogram. The days are stacked into
+    one array and folded into weekday rows with a single np.add.at.
+    """
+    rows, weekdays = [], []
+    for histogram in histograms:
+        if app is not None:
+            row = histogram.apps.get(app)
+            if row is None:
+                continue
+        else:
+            row = histogram.total(include_idle)
+        rows.append(row.reshape(24, -1).sum(axis=1))
+        weekdays.append(datetime.strptime(histogram.date_str, "%Y-%m-%d").weekday())
+
+    matrix = np.zeros((7, 24))
+    if rows:
+        np.add.at(matrix, np.array(weekdays), np.vstack(rows))
+    return matrix
@@ -0,0 +1,76 @@
+import sys
+import time
+
+# Time spent idle is recorded under this name alongside the real apps
+IDLE_APP = "Idle"
+
+
+class IdleSource:
+    """Reports how long it has been since the last keyboard or mouse input"""
+
+    def idle_seconds(self):
+        raise NotImplementedError
+
+
+class WindowsIdleSource(IdleSource):
+    """Last-input time from GetLastInputInfo"""
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.UINT), ("dwTime", wintypes.DWORD)]
+
+        self.ctypes = ctypes
+        self.user32 = ctypes.windll.user32
+        self.kernel32 = ctypes.windll.kernel32
+        self.info = LASTINPUTINFO()
+        self.info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+
+    def idle_seconds(self):
+        if not self.user32.GetLastInputInfo(self.ctypes.byref(self.info)):
+            return 0.0
+        # Both are 32-bit millisecond tick counts that wrap every ~49 days
+        millis = (self.kernel32.GetTickCount() - self.info.dwTime) & 0xFFFFFFFF
+        return millis / 1000.0
+
+
+class FakeIdleSource(IdleSource):
+    """Idle source for tests: call touch() to simulate input"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.last_input = clock()
+
+    def touch(self, when=None):
+        self.last_input = self.clock() if when is None else when
+
+    def idle_seconds(self):
+        return max(0.0, self.clock() - self.last_input)
+
+
+class IdleDetector:
+    """Decides when the user is away
+
+    After `threshold` seconds without input the tracker stops crediting the
+    foreground app, books the time to IDLE_APP instead and only wakes every
+    `idle_interval` seconds. Because the source reports when input last
+    happened, both the start and the end of an idle period are placed
+    exactly, whatever the wake cadence.
+    """
+
+    def __init__(self, source, threshold=300.0, idle_interval=10.0):
+        self.source = source
+        self.threshold = threshold
+        self.idle_interval = idle_interval
+
+    def idle_seconds(self):
+        return self.source.idle_seconds()
+
+    @classmethod
+    def default(cls):
+        """Detector for the current platform, or None if there isn't one"""
+        if sys.platform == "win32":
+            return cls(WindowsIdleSource())
+        return None
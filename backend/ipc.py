@@ -0,0 +1,319 @@
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import socket
+import struct
+import sys
+from collections import deque
+from threading import Thread
+
+DEFAULT_PORT = 47821
+DEFAULT_SOCKET = "/tmp/timetracker.sock"
+HEADER = struct.Struct(">I")
+MAX_FRAME = 1 << 20
+CLOSE_GRACE = 1.0  # seconds a client gets to flush before it is cut off
+
+# Wire format: every message is a 4-byte big-endian length followed by that
+# many bytes of compact UTF-8 JSON with a "t" (type) field.
+#
+#   server -> client
+#     {"t": "snapshot", "seq": n, "app_times": {...}, "app": ..., "title": ..., "status": ...}
+#     {"t": "delta", "seq": n, "times": {app: total, ...}}     changed totals only
+#     {"t": "activity", "seq": n, "app": ..., "title": ...}
+#     {"t": "status", "seq": n, "status": ...}
+#     {"t": "reply", "id": ..., "ok": true, "result": ...}     or "ok": false, "error": ...
+#   client -> server
+#     {"t": "cmd", "id": ..., "cmd": "pause" | "resume" | "stop" | "snapshot" | "query_range"
+#      | "tick_stats", "args": {...}}
+#
+# seq increases by one per streamed message, so a client that sees a jump
+# knows it missed something; a fresh snapshot always follows a drop.
+
+
+def encode_frame(message):
+    payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(payload)) + payload
+
+
+def default_address():
+    """Unix socket where available, localhost TCP otherwise (Windows)"""
+    if sys.platform == "win32":
+        return ("127.0.0.1", DEFAULT_PORT)
+    return DEFAULT_SOCKET
+
+
+class _Client:
+    def __init__(self, writer, buffer_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        self.needs_snapshot = True
+        self.task = asyncio.current_task()
+
+
+class IpcServer:
+    """Streams tracker state to local clients and accepts commands
+
+    Each client gets a snapshot on connect and then a stream of deltas.
+    Every client has its own bounded queue; when a slow client's queue
+    fills up, its backlog is thrown away and it is sent one fresh snapshot
+    instead, so a stuck reader never holds up the tracker or other clients.
+
+    The publish_* methods are safe to call from any thread. `controller`
+    handles commands: pause(), resume(), request_stop(),
+    query_range(start, end) and tick_stats().
+    """
+
+    def __init__(self, controller, address=None, buffer_size=64):
+        self.controller = controller
+        self.address = address or default_address()
+        self.buffer_size = buffer_size
+        self.clients = set()
+        self.seq = 0
+        self.app_times = {}
+        self.current = ("", "")
+        self.status = "active"
+        self.loop = None
+        self.server = None
+        self.thread = None
+
+    # Publishing (any thread)
+
+    def _call(self, callback, *args):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def publish_times(self, app_times):
+        self._call(self._on_times, app_times)
+
+    def publish_delta(self, seq, changes):
+        self._call(self._on_delta, changes)
+
+    def publish_activity(self, app, title):
+        self._call(self._on_activity, app, title)
+
+    def publish_status(self, status):
+        self._call(self._on_status, status)
+
+    # Loop side
+
+    def _on_times(self, app_times):
+        changed = {app: total for app, total in app_times.items() if self.app_times.get(app) != total}
+        self.app_times = dict(app_times)
+        if changed:
+            self._broadcast({"t": "delta", "times": changed})
+
+    def _on_delta(self, changes):
+        # Streams from the accountant are lossless here (call_soon_threadsafe
+        # or the same loop), so the tracker's own seq needs no checking
+        for app, total in changes:
+            self.app_times[app] = total
+        self._broadcast({"t": "delta", "times": dict(changes)})
+
+    def _on_activity(self, app, title):
+        self.current = (app, title)
+        self._broadcast({"t": "activity", "app": app, "title": title})
+
+    def _on_status(self, status):
+        self.status = status
+        self._broadcast({"t": "status", "status": status})
+
+    def snapshot_message(self):
+        return {
+            "t": "snapshot", "seq": self.seq, "app_times": self.app_times,
+            "app": self.current[0], "title": self.current[1], "status": self.status,
+        }
+
+    def _broadcast(self, message):
+        self.seq += 1
+        message["seq"] = self.seq
+        for client in self.clients:
+            if client.needs_snapshot:
+                continue
+            if client.queue.full():
+                # Fell behind: drop the backlog, resync with a snapshot
+                while not client.queue.empty():
+                    client.queue.get_nowait()
+                client.needs_snapshot = True
+                client.queue.put_nowait(None)
+                continue
+            client.queue.put_nowait(message)
+
+    async def _write_loop(self, client):
+        writer = client.writer
+        while True:
+            if client.needs_snapshot:
+                client.needs_snapshot = False
+                writer.write(encode_frame(self.snapshot_message()))
+            else:
+                message = await client.queue.get()
+                if message is None:
+                    continue
+                writer.write(encode_frame(message))
+            await writer.drain()
+
+    async def _handle_command(self, client, message):
+        reply = {"t": "reply", "id": message.get("id")}
+        try:
+            result = self.run_command(message.get("cmd"), message.get("args") or {})
+            if asyncio.iscoroutine(result):
+                result = await result
+            reply["result"] = result
+            reply["ok"] = True
+        except Exception as e:
+            reply["ok"] = False
+            reply["error"] = str(e)
+        client.writer.write(encode_frame(reply))
+        await client.writer.drain()
+
+    def run_command(self, cmd, args):
+        if cmd == "pause":
+            return self.controller.pause()
+        if cmd == "resume":
+            return self.controller.resume()
+        if cmd == "stop":
+            return self.controller.request_stop()
+        if cmd == "snapshot":
+            return self.snapshot_message()
+        if cmd == "query_range":
+            return self.controller.query_range(args["start"], args["end"])
+        if cmd == "tick_stats":
+            return self.controller.tick_stats()
+        raise ValueError(f"Unknown command: {cmd}")
+
+    async def _serve_client(self, reader, writer):
+        client = _Client(writer, self.buffer_size)
+        self.clients.add(client)
+        write_task = asyncio.create_task(self._write_loop(client))
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                (length,) = HEADER.unpack(header)
+                if length > MAX_FRAME:
+                    break
+                message = json.loads(await reader.readexactly(length))
+                if message.get("t") == "cmd":
+                    await self._handle_command(client, message)
+        except (asyncio.IncompleteReadError, ConnectionError, json.JSONDecodeError):
+            pass
+        finally:
+            self.clients.discard(client)
+            write_task.cancel()
+            await asyncio.gather(write_task, return_exceptions=True)
+            writer.close()
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        if isinstance(self.address, tuple):
+            host, port = self.address
+            self.server = await asyncio.start_server(self._serve_client, host, port)
+        else:
+            self.server = await asyncio.start_unix_server(self._serve_client, self.address)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+        # Closing the transport ends each client's read loop with EOF, once
+        # its write buffer has drained
+        clients = list(self.clients)
+        for client in clients:
+            client.writer.close()
+        tasks = [client.task for client in clients]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=CLOSE_GRACE)
+            if pending:
+                # A client that stopped reading never drains: cut it off.
+                # Aborting ends the read loop with a connection error.
+                for client in clients:
+                    client.writer.transport.abort()
+                _, pending = await asyncio.wait(pending, timeout=CLOSE_GRACE)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+
+    def start_in_thread(self):
+        """Serve on a private event loop thread, for the threaded engine"""
+        loop = asyncio.new_event_loop()
+        started = []
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            started.append(True)
+            loop.run_forever()
+
+        self.thread = Thread(target=run, daemon=True)
+        self.thread.start()
+        while not started and self.thread.is_alive():
+            self.thread.join(0.01)
+        return self.thread
+
+    def stop_thread(self):
+        if self.loop is None or self.thread is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self.close(), self.loop)
+        try:
+            future.result(timeout=5)
+        except concurrent.futures.TimeoutError:
+            print("Warning: IPC server did not close within 5s")
+            future.cancel()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+class IpcClient:
+    """Blocking client: stream messages with messages(), commands with request()"""
+
+    def __init__(self, address=None, timeout=5.0):
+        address = address or default_address()
+        if isinstance(address, tuple):
+            self.sock = socket.create_connection(address, timeout=timeout)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(address)
+        self.ids = itertools.count(1)
+        self.pending = deque()
+
+    def _read_exactly(self, size):
+        chunks = []
+        while size:
+            chunk = self.sock.recv(size)
+            if not chunk:
+                raise ConnectionError("IPC server closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def read_message(self):
+        if self.pending:
+            return self.pending.popleft()
+        (length,) = HEADER.unpack(self._read_exactly(HEADER.size))
+        return json.loads(self._read_exactly(length))
+
+    def messages(self):
+        while True:
+            yield self.read_message()
+
+    def request(self, cmd, **args):
+        request_id = next(self.ids)
+        self.sock.sendall(encode_frame({"t": "cmd", "id": request_id, "cmd": cmd, "args": args}))
+        skipped = []
+        try:
+            while True:
+                (length,) = HEADER.unpack(self._read_exactly(HEADER.size))
+                message = json.loads(self._read_exactly(length))
+                if message.get("t") == "reply" and message.get("id") == request_id:
+                    if not message["ok"]:
+                        raise RuntimeError(message.get("error"))
+                    return message.get("result")
+                skipped.append(message)
+        finally:
+            # Stream messages that arrived meanwhile stay readable, in order
+            self.pending.extend(skipped)
+
+    def close(self):
+        self.sock.close()
@@ -1,8 +1,4 @@
-from backend.tracker import BackendTracker
-
-def main():
-    tracker = BackendTracker()
-    tracker.start_tracking()
+from backend.daemon import main
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,172 @@
+import argparse
+import hashlib
+import json
+import uuid
+from pathlib import Path
+
+from backend.fileio import write_json
+
+DEFAULT_DATA_DIR = Path.home() / "TimeTracker"
+EXPORT_FORMAT = "timetracker-device-store"
+
+
+def load_device_id(data_dir):
+    """Return this store's device id, creating one on first use"""
+    path = Path(data_dir) / "device_id"
+    try:
+        device_id = path.read_text().strip()
+        if device_id:
+            return device_id
+    except FileNotFoundError:
+        pass
+    device_id = uuid.uuid4().hex
+    path.write_text(device_id)
+    return device_id
+
+
+def export_store(all_data, device_id, out_path):
+    """Write a device export: this device's per-day totals tagged with its id"""
+    export = {"format": EXPORT_FORMAT, "device_id": device_id, "days": all_data}
+    out_path = Path(out_path)
+    write_json(out_path, export)
+    return out_path
+
+
+def day_digest(day_data):
+    blob = json.dumps(day_data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+class MergedStore:
+    """Grow-only per-device counters combining several device exports
+
+    Each (device, date, app) cell only ever takes the max of what it has
+    seen, so merging the same export twice, or exports in any order, gives
+    the same result. Combined totals are the sum over devices.
+
+    The flip side is that a merge can't express a reduction: once a cell
+    has been merged, a later export with a smaller value (a correction that
+    deletes or takes time off) leaves it unchanged. Correct before exporting,
+    or start a fresh merge store after correcting old days. A digest per
+    (device, date) of the last export seen lets unchanged days be skipped
+    without touching them, and merge_file() skips an export file whose
+    mtime and size haven't changed without even parsing it, so a run costs
+    O(changed days).
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.devices = {}   # device_id -> {date: {app: seconds}}
+        self.digests = {}   # device_id -> {date: digest of the exported day}
+        self.files = {}     # export file name -> [mtime_ns, size] when last merged
+        if self.path and self.path.exists():
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            self.devices = state.get("devices", {})
+            self.digests = state.get("digests", {})
+            self.files = state.get("files", {})
+
+    def merge_export(self, export):
+        """Merge one device export, returning the dates that changed"""
+        if export.get("format") != EXPORT_FORMAT:
+            raise ValueError("Not a device store export")
+        device_id = export["device_id"]
+        device_days = self.devices.setdefault(device_id, {})
+        device_digests = self.digests.setdefault(device_id, {})
+
+        changed = []
+        for date_str, day_data in export["days"].items():
+            digest = day_digest(day_data)
+            if device_digests.get(date_str) == digest:
+                continue
+            current = device_days.setdefault(date_str, {})
+            updated = False
+            for app, seconds in day_data.items():
+                if seconds > current.get(app, 0):
+                    current[app] = seconds
+                    updated = True
+            # The export's digest, not the merged day's: the next run skips
+            # this day as long as the device exports the same data
+            device_digests[date_str] = digest
+            if updated:
+                changed.append(date_str)
+        return changed
+
+    def merge_file(self, path):
+        """merge_export() a file, skipping it if unchanged since the last merge"""
+        path = Path(path)
+        stat = path.stat()
+        key = [stat.st_mtime_ns, stat.st_size]
+        if self.files.get(path.name) == key:
+            return []
+        with open(path, 'r') as f:
+            changed = self.merge_export(json.load(f))
+        self.files[path.name] = key
+        return changed
+
+    def get_date_data(self, date_str):
+        """Combined totals for one date across all devices"""
+        totals = {}
+        for device_days in self.devices.values():
+            for app, seconds in device_days.get(date_str, {}).items():
+                totals[app] = totals.get(app, 0) + seconds
+        return totals
+
+    def combined_data(self):
+        """Combined {date: {app: seconds}} in the tracking_data.json layout"""
+        dates = set()
+        for device_days in self.devices.values():
+            dates.update(device_days)
+        return {date_str: self.get_date_data(date_str) for date_str in sorted(dates)}
+
+    def save(self, path=None):
+        write_json(Path(path) if path else self.path,
+                   {"devices": self.devices, "digests": self.digests, "files": self.files})
+
+
+def merge_directory(export_dir, store):
+    """Merge every *.json export in a directory. Returns {file: changed dates}"""
+    results = {}
+    for path in sorted(Path(export_dir).glob("*.json")):
+        try:
+            results[path.name] = store.merge_file(path)
+        except (ValueError, KeyError, json.JSONDecodeError) as e:
+            print(f"Skipping {path.name}: {e}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export and merge TimeTracker stores across devices")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="export this device's store")
+    export.add_argument("out_dir", help="directory to write the export into")
+    export.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR))
+
+    merge = sub.add_parser("merge", help="merge a directory of device exports")
+    merge.add_argument("export_dir")
+    merge.add_argument("--store", default=str(DEFAULT_DATA_DIR / "merged_store.json"),
+                       help="merge state, reused across runs")
+    merge.add_argument("--output", help="write combined totals in tracking_data.json layout")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        # Exports carry the corrected totals; storage imports this module
+        from backend.storage import DataManager
+        out_path = DataManager(args.data_dir).export_store(args.out_dir)
+        with open(out_path, 'r') as f:
+            days = len(json.load(f)["days"])
+        print(f"Exported {days} days to {out_path}")
+    elif args.command == "merge":
+        store = MergedStore(args.store)
+        results = merge_directory(args.export_dir, store)
+        store.save()
+        for name, changed in results.items():
+            print(f"{name}: {len(changed)} days changed")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(store.combined_data(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
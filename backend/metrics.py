@@ -0,0 +1,151 @@
+import time
+from contextlib import contextmanager
+from threading import Lock, Thread, Event
+
+
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of durations in microseconds
+
+    Values below `sub_count` get exact buckets; above that every power of two
+    is split into `sub_count / 2` linear buckets, so the relative error of any
+    reported percentile stays under 2 / sub_count with a handful of buckets.
+    """
+
+    def __init__(self, sub_bits=5):
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.half = self.sub_count >> 1
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half + ((value >> shift) - self.half)
+
+    def _bounds(self, index):
+        if index < self.sub_count:
+            return index, index + 1
+        offset = index - self.sub_count
+        shift = offset // self.half + 1
+        mantissa = offset % self.half + self.half
+        return mantissa << shift, (mantissa + 1) << shift
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1_000_000))
+        index = self._index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct):
+        """Upper bound, in microseconds, of the bucket holding the pct-th value"""
+        if not self.count:
+            return 0
+        target = max(1, int(round(self.count * pct / 100.0)))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(self._bounds(index)[1], self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count if self.count else 0,
+            "min_us": self.min or 0,
+            "p50_us": self.percentile(50),
+            "p99_us": self.percentile(99),
+            "max_us": self.max,
+        }
+
+
+class Metrics:
+    """Thread-safe counters and latency histograms, queryable and reportable"""
+
+    def __init__(self, name="metrics"):
+        self.name = name
+        self.lock = Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def incr(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def observe(self, histogram, seconds):
+        with self.lock:
+            hist = self.histograms.get(histogram)
+            if hist is None:
+                hist = self.histograms[histogram] = LatencyHistogram()
+            hist.record(seconds)
+
+    @contextmanager
+    def timer(self, histogram):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(histogram, time.perf_counter() - start)
+
+    def get(self, counter):
+        return self.counters.get(counter, 0)
+
+    def snapshot(self):
+        """Plain-dict copy of every counter and histogram summary"""
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {name: hist.summary() for name, hist in self.histograms.items()},
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def report(self):
+        """Human-readable dump of the current snapshot"""
+        snap = self.snapshot()
+        lines = [f"[{self.name}]"]
+        for counter, value in sorted(snap["counters"].items()):
+            lines.append(f"  {counter:<24} {value}")
+        for name, s in sorted(snap["histograms"].items()):
+            lines.append(
+                f"  {name:<24} n={s['count']} mean={s['mean_us']:.0f}us "
+                f"p50={s['p50_us']}us p99={s['p99_us']}us max={s['max_us']}us"
+            )
+        return "\n".join(lines)
+
+
+class MetricsReporter:
+    """Background thread that dumps a Metrics report every `interval` seconds"""
+
+    def __init__(self, metrics, interval=60, sink=print):
+        self.metrics = metrics
+        self.interval = interval
+        self.sink = sink
+        self._stop = Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sink(self.metrics.report())
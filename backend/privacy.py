@@ -0,0 +1,182 @@
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+# Window titles of private browser windows
+DEFAULT_TITLE_PATTERNS = (
+    "InPrivate",         # Edge
+    "Incognito",         # Chrome
+    "Private Browsing",  # Firefox
+    "Private Window",    # Safari
+)
+
+
+class PatternSet:
+    """Many case-insensitive patterns matched in one pass over a title
+
+    Plain substrings are indexed by their first three characters, so a
+    title is scanned once with a dict lookup per position, however many
+    patterns there are; only patterns starting with a trigram actually
+    present get compared. Patterns prefixed with "re:" are regexes and are
+    combined into a single alternation.
+    """
+
+    GRAM = 3
+
+    def __init__(self, patterns):
+        self.index = {}
+        self.short = []
+        regexes = []
+        for pattern in patterns:
+            if pattern in ("", "re:"):
+                continue  # would match every title and hide everything
+            if pattern.startswith("re:"):
+                regexes.append(f"(?:{pattern[3:]})")
+            elif len(pattern) < self.GRAM:
+                self.short.append(pattern.lower())
+            else:
+                literal = pattern.lower()
+                self.index.setdefault(literal[:self.GRAM], []).append(literal)
+        self.regex = re.compile("|".join(regexes), re.IGNORECASE) if regexes else None
+
+    def __bool__(self):
+        return bool(self.index or self.short or self.regex)
+
+    def search(self, title):
+        text = title.lower()
+        index = self.index
+        if index:
+            gram = self.GRAM
+            for i in range(len(text) - gram + 1):
+                candidates = index.get(text[i:i + gram])
+                if candidates and any(text.startswith(literal, i) for literal in candidates):
+                    return True
+        if any(literal in text for literal in self.short):
+            return True
+        return self.regex is not None and self.regex.search(title) is not None
+
+
+class PrivacyMatcher:
+    """Decides which windows must not be tracked
+
+    Three kinds of rule:
+      title_patterns      any window whose title matches
+      apps                every window of these processes (e.g. keepass.exe)
+      app_title_patterns  {process: patterns} matching that process only
+
+    Patterns are case-insensitive substrings, or regexes when prefixed with
+    "re:"; each rule set is compiled into one PatternSet. Results are
+    memoized per (process, title), so a window that stays in front costs a
+    single dict lookup per tick.
+    """
+
+    def __init__(self, title_patterns=DEFAULT_TITLE_PATTERNS, apps=(), app_title_patterns=None,
+                 memo_size=1024):
+        # The rules as given, in from_config() form (recordings store them)
+        self.config = {"title_patterns": list(title_patterns), "apps": list(apps),
+                       "app_title_patterns": dict(app_title_patterns or {}),
+                       "include_defaults": False}
+        self.title_patterns = PatternSet(title_patterns)
+        self.apps = {app.lower() for app in apps}
+        self.app_patterns = {}
+        for app, patterns in (app_title_patterns or {}).items():
+            pattern_set = PatternSet(patterns)
+            if pattern_set:
+                self.app_patterns[app.lower()] = pattern_set
+        self.memo_size = memo_size
+        self.memo = {}
+
+    def _match(self, title, app):
+        if app:
+            app = app.lower()
+            if app in self.apps:
+                return True
+            pattern_set = self.app_patterns.get(app)
+            if pattern_set is not None and pattern_set.search(title):
+                return True
+        return self.title_patterns.search(title)
+
+    def is_private(self, title, app=None):
+        key = (app, title)
+        result = self.memo.get(key)
+        if result is None:
+            if len(self.memo) >= self.memo_size:
+                # Titles churn slowly; starting over is cheaper than an LRU
+                self.memo.clear()
+            result = self.memo[key] = self._match(title or "", app)
+        return result
+
+    @classmethod
+    def from_config(cls, config):
+        title_patterns = list(config.get("title_patterns", []))
+        if config.get("include_defaults", True):
+            title_patterns = list(DEFAULT_TITLE_PATTERNS) + title_patterns
+        return cls(
+            title_patterns=title_patterns,
+            apps=config.get("apps", []),
+            app_title_patterns=config.get("app_title_patterns", {}),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Rules from a JSON config file; the defaults if there is none
+
+            {"title_patterns": ["re:^Bank of .*"], "apps": ["keepass.exe"],
+             "app_title_patterns": {"slack.exe": ["#hr-private"]},
+             "include_defaults": true}
+        """
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        try:
+            with open(path, 'r') as f:
+                return cls.from_config(json.load(f))
+        except Exception as e:
+            print(f"Error loading privacy rules, using defaults: {e}")
+            return cls()
+
+
+def bench(rules, titles, ticks, seed_apps=50):
+    """Time the matcher with `rules` title rules against the old substring loop"""
+    patterns = [f"secret project {i}" for i in range(rules)]
+    app_rules = {f"app{i}.exe": [f"private channel {i}"] for i in range(seed_apps)}
+    matcher = PrivacyMatcher(list(DEFAULT_TITLE_PATTERNS) + patterns,
+                             apps=["keepass.exe"], app_title_patterns=app_rules)
+    samples = [(f"app{i % seed_apps}.exe", f"Document {i} - Editor") for i in range(titles)]
+    indicators = list(DEFAULT_TITLE_PATTERNS) + patterns
+
+    def naive(title):
+        return any(indicator.lower() in title.lower() for indicator in indicators)
+
+    results = {}
+    # A tick re-checks the title in front; it changes every `ticks // titles` ticks
+    stream = [samples[i * titles // ticks] for i in range(ticks)]
+    start = time.perf_counter()
+    for app, title in stream:
+        naive(title)
+    results["naive_us"] = (time.perf_counter() - start) / ticks * 1e6
+    start = time.perf_counter()
+    for app, title in stream:
+        matcher._match(title, app)
+    results["compiled_us"] = (time.perf_counter() - start) / ticks * 1e6
+    start = time.perf_counter()
+    for app, title in stream:
+        matcher.is_private(title, app)
+    results["memoized_us"] = (time.perf_counter() - start) / ticks * 1e6
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the privacy matcher")
+    parser.add_argument("--rules", type=int, default=500)
+    parser.add_argument("--titles", type=int, default=1000, help="distinct window titles")
+    parser.add_argument("--ticks", type=int, default=100000)
+    args = parser.parse_args(argv)
+    for key, value in bench(args.rules, args.titles, args.ticks).items():
+        print(f"{key:>12}: {value:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import time
+from bisect import bisect_right
+from collections import namedtuple, OrderedDict
+
+from backend.metrics import Metrics
+
+# One reading of the foreground window. pid and process_name are None when
+# the window has no owning process we can resolve.
+ForegroundSnapshot = namedtuple("ForegroundSnapshot", "hwnd title pid process_name")
+
+
+class ActivityProbe:
+    """Source of foreground-window snapshots for the tracker"""
+
+    def snapshot(self):
+        """Return a ForegroundSnapshot for the window currently in front"""
+        raise NotImplementedError
+
+
+class ProcessNameCache:
+    """Bounded LRU of process names keyed by (pid, create_time)
+
+    Windows reuses pids, so a pid alone is not a safe key; pairing it with
+    the process creation time is. That check is not free: a hit still
+    builds psutil.Process(pid), which opens the process and reads its
+    creation time, and only the name() query (a second open plus the image
+    path lookup) is saved. `python -m backend.probes` measures both costs.
+    Failed lookups ("Process not found", access errors) are cached per pid
+    for `negative_ttl` seconds so a dying or protected process is not
+    retried on every tick.
+    """
+
+    def __init__(self, psutil, maxsize=256, negative_ttl=5.0, clock=time.monotonic):
+        self.psutil = psutil
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.negative = {}
+        self.metrics = Metrics("process_names")
+
+    def lookup(self, pid):
+        negative = self.negative.get(pid)
+        if negative is not None:
+            name, expires = negative
+            if self.clock() < expires:
+                self.metrics.incr("negative_hits")
+                return name
+            del self.negative[pid]
+
+        try:
+            process = self.psutil.Process(pid)
+            key = (pid, process.create_time())
+            name = self.entries.get(key)
+            if name is not None:
+                self.entries.move_to_end(key)
+                self.metrics.incr("hits")
+                return name
+            self.metrics.incr("misses")
+            name = process.name()
+        except self.psutil.NoSuchProcess:
+            return self._remember_failure(pid, "Process not found")
+        except Exception as e:
+            return self._remember_failure(pid, f"Error: {e}")
+
+        self.entries[key] = name
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.metrics.incr("evictions")
+        return name
+
+    def _remember_failure(self, pid, name):
+        self.metrics.incr("negative_misses")
+        self.negative[pid] = (name, self.clock() + self.negative_ttl)
+        return name
+
+    def hit_rate(self):
+        hits = self.metrics.get("hits") + self.metrics.get("negative_hits")
+        total = hits + self.metrics.get("misses") + self.metrics.get("negative_misses")
+        return hits / total if total else 0.0
+
+
+class WindowsProbe(ActivityProbe):
+    """Foreground window via win32 and psutil
+
+    Title and pid are both read from the single handle returned by
+    GetForegroundWindow, so they always describe the same window. While the
+    handle and pid stay the same the process name is reused from the last
+    snapshot, and if the title hasn't changed either the previous snapshot
+    object itself is returned.
+
+    The win32 reads are timed into `metrics` as "foreground", process name
+    resolution as "name_lookup".
+    """
+
+    def __init__(self, name_cache_size=256, metrics=None):
+        import psutil
+        import win32gui
+        import win32process
+        self.psutil = psutil
+        self.win32gui = win32gui
+        self.win32process = win32process
+        self.name_cache = ProcessNameCache(psutil, maxsize=name_cache_size)
+        self.metrics = metrics or Metrics("probe")
+        self.last = None
+
+    def get_app_name_from_pid(self, pid):
+        return self.name_cache.lookup(pid)
+
+    def snapshot(self):
+        started = time.perf_counter()
+        try:
+            hwnd = self.win32gui.GetForegroundWindow()
+            if not hwnd:
+                return ForegroundSnapshot(None, "Unknown Window", None, None)
+            title = self.win32gui.GetWindowText(hwnd)
+            _, pid = self.win32process.GetWindowThreadProcessId(hwnd)
+        except:
+            return ForegroundSnapshot(None, "Unknown Window", None, None)
+        finally:
+            self.metrics.observe("foreground", time.perf_counter() - started)
+
+        last = self.last
+        if last is not None and last.hwnd == hwnd and last.pid == pid:
+            if last.title == title:
+                return last
+            process_name = last.process_name
+        elif pid:
+            with self.metrics.timer("name_lookup"):
+                process_name = self.get_app_name_from_pid(pid)
+        else:
+            process_name = None
+
+        self.last = ForegroundSnapshot(hwnd, title, pid or None, process_name)
+        return self.last
+
+
+class SyntheticProbe(ActivityProbe):
+    """Deterministic probe that plays back a scripted activity schedule
+
+    `schedule` is a list of (duration_seconds, process_name, title) entries
+    played back to back from the moment the probe is created, measured with
+    `clock`. A process_name of None means no foreground window. Each process
+    gets a stable fake pid and each distinct title a stable fake handle.
+    After the last entry the final window stays in front, or the schedule
+    starts over when `loop` is set.
+    """
+
+    def __init__(self, schedule, clock=time.monotonic, loop=False):
+        self.clock = clock
+        self.loop = loop
+        self.ends = []
+        self.snapshots = []
+        pids = {}
+        hwnds = {}
+        elapsed = 0.0
+        for duration, process_name, title in schedule:
+            elapsed += duration
+            self.ends.append(elapsed)
+            if process_name is None:
+                self.snapshots.append(ForegroundSnapshot(None, title or "Unknown Window", None, None))
+                continue
+            pid = pids.setdefault(process_name, 1000 + 4 * len(pids))
+            hwnd = hwnds.setdefault((process_name, title), 0x10000 + len(hwnds))
+            self.snapshots.append(ForegroundSnapshot(hwnd, title, pid, process_name))
+        self.duration = elapsed
+        self.start = clock()
+
+    def reset(self):
+        self.start = self.clock()
+
+    def snapshot(self):
+        if not self.snapshots:
+            return ForegroundSnapshot(None, "Unknown Window", None, None)
+        elapsed = self.clock() - self.start
+        if self.loop and self.duration > 0:
+            elapsed %= self.duration
+        index = min(bisect_right(self.ends, elapsed), len(self.snapshots) - 1)
+        return self.snapshots[index]
+
+
+def bench(lookups, pids=50):
+    """Time ProcessNameCache hits against uncached lookups on live processes"""
+    import psutil
+
+    live = []
+    for pid in psutil.pids():
+        try:
+            psutil.Process(pid).name()
+        except psutil.Error:
+            continue
+        live.append(pid)
+        if len(live) == pids:
+            break
+    stream = [live[i % len(live)] for i in range(lookups)]
+    cache = ProcessNameCache(psutil, maxsize=len(live))
+    for pid in live:
+        cache.lookup(pid)
+
+    def identity(pid):
+        # The part of every lookup a hit cannot skip
+        psutil.Process(pid).create_time()
+
+    def uncached(pid):
+        psutil.Process(pid).name()
+
+    results = {}
+    for name, lookup in (("uncached_us", uncached), ("identity_us", identity),
+                         ("cached_us", cache.lookup)):
+        start = time.perf_counter()
+        for pid in stream:
+            lookup(pid)
+        results[name] = (time.perf_counter() - start) / lookups * 1e6
+    results["hit_rate"] = cache.hit_rate()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the process name cache")
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--pids", type=int, default=50, help="distinct live processes")
+    args = parser.parse_args(argv)
+    for key, value in bench(args.lookups, args.pids).items():
+        print(f"{key:>12}: {value:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import asyncio
+from threading import Thread
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from backend.async_tracker import AsyncTracker
+
+
+class AsyncTrackerBridge(QObject):
+    """Runs an AsyncTracker on its own event-loop thread for a Qt GUI
+
+    Exposes the same signals and start_tracking/toggle_pause/stop methods as
+    BackendTracker. Tracker events are re-emitted as Qt signals, which Qt
+    queues onto the GUI thread; commands go the other way with
+    run_coroutine_threadsafe / call_soon_threadsafe.
+    """
+
+    activity_changed = pyqtSignal(str, str)  # app_name, window_title
+    time_updated = pyqtSignal(dict)           # app_times dict (start and resync)
+    times_changed = pyqtSignal(int, object)   # seq, ((app, total), ...)
+    status_changed = pyqtSignal(str)          # status string
+
+    def __init__(self, tracker: AsyncTracker):
+        super().__init__()
+        self.tracker = tracker
+        self.data_manager = tracker.data_manager
+        self.loop = asyncio.new_event_loop()
+        self.thread = None
+
+    def start_tracking(self):
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.resync()
+
+    def resync(self):
+        seq, app_times = self.tracker.accountant.versioned_times()
+        self.time_updated.emit(app_times)
+        return seq, app_times
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._main())
+
+    async def _main(self):
+        forward = asyncio.create_task(self._forward_events())
+        try:
+            await self.tracker.run()
+        finally:
+            forward.cancel()
+
+    async def _forward_events(self):
+        async for event in self.tracker.events():
+            if event.kind == "activity":
+                self.activity_changed.emit(*event.data)
+            elif event.kind == "delta":
+                self.times_changed.emit(*event.data)
+            elif event.kind == "status":
+                self.status_changed.emit(event.data)
+
+    def toggle_pause(self):
+        self.loop.call_soon_threadsafe(self.tracker.toggle_pause)
+
+    def stop(self, timeout=5.0):
+        """Stop the tracker and wait for its final save"""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        asyncio.run_coroutine_threadsafe(self.tracker.stop(), self.loop)
+        self.thread.join(timeout)
@@ -0,0 +1,221 @@
+import argparse
+import gzip
+import json
+import time
+from threading import Lock
+
+from backend.accounting import ActivityAccountant
+from backend.probes import ForegroundSnapshot
+from backend.privacy import PrivacyMatcher
+
+# A recording is gzipped JSON lines: a header object, then one array per
+# accountant input in the order the accountant received it:
+#
+#   ["s", t, hwnd, title, pid, process_name]   observe(snapshot, t)
+#   ["h", t, hwnd, title, pid, process_name]   handle_snapshot(snapshot, t)
+#   ["a", t]                                   advance(t)
+#   ["i", t, idle_seconds]                     check_idle(t), with the reading it saw
+#   ["c", t]  close_interval(t)     ["p", t]  paused_tick(t)
+#   ["g", t]  mark_gap(t)           ["t", t]  toggle_pause()
+#   ["b", t]  start(t)              ["e", t]  settle(t)
+#   ["d", t]  close_day(t)
+#
+# Times are the tracker's monotonic timestamps, stored exactly, so replay
+# repeats the same float arithmetic and ends on identical totals.
+FORMAT = "timetracker-recording"
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class RecordingIdleDetector:
+    """Wraps an IdleDetector and remembers the last reading"""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.threshold = detector.threshold
+        self.idle_interval = detector.idle_interval
+        self.last = None
+
+    def idle_seconds(self):
+        self.last = self.detector.idle_seconds()
+        return self.last
+
+
+class ReplayIdleDetector:
+    """Idle detector that returns the recorded reading set by the replay driver"""
+
+    def __init__(self, threshold, idle_interval):
+        self.threshold = threshold
+        self.idle_interval = idle_interval
+        self.value = 0.0
+
+    def idle_seconds(self):
+        return self.value
+
+
+class RecordingAccountant:
+    """Stands in for an ActivityAccountant and logs every input it is given
+
+    The tracking loop talks to this proxy instead of the accountant.
+    Inputs are forwarded and written under one lock, so the log has
+    exactly the order the accountant saw, even with a hotkey thread
+    toggling pause. Everything else (state, snapshot(), ...) passes
+    straight through.
+    """
+
+    def __init__(self, accountant, path, clock=time.monotonic):
+        self.__dict__["accountant"] = accountant
+        self.__dict__["clock"] = clock
+        self.__dict__["lock"] = Lock()
+        if accountant.idle_detector is not None:
+            accountant.idle_detector = RecordingIdleDetector(accountant.idle_detector)
+        detector = accountant.idle_detector
+        self.__dict__["file"] = _open(path, "w")
+        self._write({
+            "format": FORMAT, "version": 1,
+            "app_times": accountant.copy_times(),
+            "idle": [detector.threshold, detector.idle_interval] if detector is not None else None,
+            "privacy": accountant.privacy.config,
+        })
+
+    def __getattr__(self, name):
+        return getattr(self.accountant, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.accountant, name, value)
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def _call(self, record, method, *args):
+        with self.lock:
+            result = method(*args)
+            self._write(record)
+            return result
+
+    def start(self, t):
+        return self._call(["b", t], self.accountant.start, t)
+
+    def observe(self, snapshot, t):
+        return self._call(["s", t, *snapshot], self.accountant.observe, snapshot, t)
+
+    def handle_snapshot(self, snapshot, t):
+        return self._call(["h", t, *snapshot], self.accountant.handle_snapshot, snapshot, t)
+
+    def advance(self, t):
+        return self._call(["a", t], self.accountant.advance, t)
+
+    def check_idle(self, t):
+        with self.lock:
+            result = self.accountant.check_idle(t)
+            detector = self.accountant.idle_detector
+            if detector is not None:
+                self._write(["i", t, detector.last])
+            return result
+
+    def close_interval(self, t):
+        return self._call(["c", t], self.accountant.close_interval, t)
+
+    def paused_tick(self, t):
+        return self._call(["p", t], self.accountant.paused_tick, t)
+
+    def mark_gap(self, t):
+        return self._call(["g", t], self.accountant.mark_gap, t)
+
+    def toggle_pause(self):
+        return self._call(["t", self.clock()], self.accountant.toggle_pause)
+
+    def close_day(self, t):
+        return self._call(["d", t], self.accountant.close_day, t)
+
+    def settle(self, t):
+        result = self._call(["e", t], self.accountant.settle, t)
+        self.close()
+        return result
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+def read_recording(path):
+    """(header, iterator over input records)"""
+    f = _open(path, "r")
+    header = json.loads(f.readline())
+    if header.get("format") != FORMAT:
+        f.close()
+        raise ValueError(f"{path} is not a tracker recording")
+
+    def records():
+        with f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    return header, records()
+
+
+def replay(path, speed=None, sleep=time.sleep, **accountant_options):
+    """Feed a recording through a fresh ActivityAccountant and return it
+
+    speed=None runs as fast as possible; otherwise the gaps between inputs
+    are slept, divided by speed (1.0 is real time). accountant_options
+    (on_delta, recorders, ...) are passed to the accountant.
+    """
+    header, records = read_recording(path)
+    detector = ReplayIdleDetector(*header["idle"]) if header.get("idle") else None
+    privacy = PrivacyMatcher.from_config(header["privacy"]) if header.get("privacy") else None
+    accountant = ActivityAccountant(dict(header["app_times"]), idle_detector=detector,
+                                    privacy=privacy, **accountant_options)
+    previous = None
+    for record in records:
+        kind, t = record[0], record[1]
+        if speed and previous is not None and t > previous:
+            sleep((t - previous) / speed)
+        previous = t
+        if kind == "s":
+            accountant.observe(ForegroundSnapshot(*record[2:]), t)
+        elif kind == "h":
+            accountant.handle_snapshot(ForegroundSnapshot(*record[2:]), t)
+        elif kind == "a":
+            accountant.advance(t)
+        elif kind == "i":
+            detector.value = record[2]
+            accountant.check_idle(t)
+        elif kind == "c":
+            accountant.close_interval(t)
+        elif kind == "p":
+            accountant.paused_tick(t)
+        elif kind == "g":
+            accountant.mark_gap(t)
+        elif kind == "t":
+            accountant.toggle_pause()
+        elif kind == "b":
+            accountant.start(t)
+        elif kind == "e":
+            accountant.settle(t)
+        elif kind == "d":
+            accountant.close_day(t)
+    return accountant
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a tracker recording and print the totals")
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, help="speed multiple (default: as fast as possible)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    accountant = replay(args.recording, speed=args.speed)
+    elapsed = time.perf_counter() - started
+    for app, seconds in sorted(accountant.copy_times().items(), key=lambda item: -item[1]):
+        print(f"{seconds:12.3f}  {app}")
+    print(f"replayed {accountant.seq} credits in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import time
+from collections import OrderedDict
+
+from backend.metrics import Metrics
+
+
+class ResourceStats:
+    """Per-app CPU and memory summary for one day (mean and max)"""
+
+    folder = "resources"
+
+    def __init__(self, date_str):
+        self.date_str = date_str
+        self.apps = {}  # app -> [samples, cpu_sum, cpu_max, rss_sum, rss_max]
+        self.dirty = False
+
+    def add(self, app, cpu_percent, rss):
+        entry = self.apps.get(app)
+        if entry is None:
+            entry = self.apps[app] = [0, 0.0, 0.0, 0, 0]
+        entry[0] += 1
+        entry[1] += cpu_percent
+        entry[2] = max(entry[2], cpu_percent)
+        entry[3] += rss
+        entry[4] = max(entry[4], rss)
+        self.dirty = True
+
+    def summary(self, app=None):
+        """{app: {"samples", "cpu_mean", "cpu_max", "rss_mean", "rss_max"}}, rss in bytes"""
+        apps = [app] if app is not None else list(self.apps)
+        result = {}
+        for name in apps:
+            entry = self.apps.get(name)
+            if entry is None:
+                continue
+            samples, cpu_sum, cpu_max, rss_sum, rss_max = entry
+            result[name] = {"samples": samples, "cpu_mean": cpu_sum / samples, "cpu_max": cpu_max,
+                            "rss_mean": rss_sum / samples, "rss_max": rss_max}
+        return result
+
+    def to_json(self):
+        return {"format": "timetracker-resources", "date": self.date_str,
+                "apps": {app: list(entry) for app, entry in list(self.apps.items())}}
+
+    @classmethod
+    def from_json(cls, data):
+        stats = cls(data["date"])
+        stats.apps = {app: list(entry) for app, entry in data["apps"].items()}
+        return stats
+
+
+class ResourceSampler:
+    """Samples CPU and memory of the foreground process at a low rate
+
+    sample() is meant to be called on every tracker tick and returns at
+    once unless `interval` seconds have passed. Reads are batched inside
+    Process.oneshot(), and Process objects are cached per pid: psutil
+    computes cpu_percent against the previous call on the same object, so
+    a fresh object would need a second read (or a blocking interval).
+
+    The sampler times itself. It never spends more than `max_overhead` (a
+    fraction of wall time) on sampling: a slow read pushes the next one
+    further out.
+    """
+
+    def __init__(self, stats, psutil=None, interval=15.0, max_overhead=0.005, cache_size=16,
+                 timer=time.perf_counter):
+        if psutil is None:
+            import psutil
+        self.psutil = psutil
+        self.stats = stats
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.cache_size = cache_size
+        self.timer = timer
+        self.processes = OrderedDict()
+        self.next_due = None
+        self.metrics = Metrics("resources")
+
+    def _process(self, pid):
+        process = self.processes.get(pid)
+        if process is not None and process.is_running():
+            self.processes.move_to_end(pid)
+            return process, False
+        # New pid, or the pid now belongs to another process
+        process = self.processes[pid] = self.psutil.Process(pid)
+        self.processes.move_to_end(pid)
+        if len(self.processes) > self.cache_size:
+            self.processes.popitem(last=False)
+        return process, True
+
+    def sample(self, app, pid, now):
+        """Record app's usage if a sample is due; now is the tracker's monotonic time"""
+        if not pid or (self.next_due is not None and now < self.next_due):
+            return
+        started = self.timer()
+        try:
+            process, fresh = self._process(pid)
+            with process.oneshot():
+                cpu_percent = process.cpu_percent(None)
+                rss = process.memory_info().rss
+            if fresh:
+                # cpu_percent's first call has no baseline; it reads 0.0
+                self.metrics.incr("primed")
+            else:
+                self.stats.add(app, cpu_percent, rss)
+                self.metrics.incr("samples")
+        except (self.psutil.NoSuchProcess, self.psutil.AccessDenied):
+            self.processes.pop(pid, None)
+            self.metrics.incr("errors")
+        elapsed = self.timer() - started
+        self.metrics.observe("sample", elapsed)
+        self.metrics.incr("busy_us", int(elapsed * 1e6))
+
+        delay = self.interval
+        if elapsed > self.max_overhead * self.interval:
+            delay = elapsed / self.max_overhead
+            self.metrics.incr("throttled")
+        self.next_due = now + delay
+
+    def overhead(self, wall_seconds):
+        """Fraction of wall_seconds spent sampling"""
+        return self.metrics.get("busy_us") / 1e6 / wall_seconds if wall_seconds else 0.0
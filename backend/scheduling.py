@@ -0,0 +1,225 @@
+import argparse
+import random
+import time
+from collections import namedtuple
+from datetime import datetime
+
+
+class AdaptiveInterval:
+    """Sampling interval that backs off while the foreground stays the same
+
+    After a change the tracker samples every `min_interval` seconds. Once
+    `patience` samples in a row saw no change, each further stable sample
+    multiplies the interval by `backoff`, up to `max_interval`. Elapsed time
+    is still credited exactly, so the interval only bounds how late a switch
+    can be noticed: at most `max_interval` seconds of one app can be
+    attributed to the previous one per switch.
+
+    The default ceiling of 5 s loosens the fixed loop's 1 s bound in
+    exchange for far fewer wake-ups while one window stays in front; pass
+    max_interval=1.0 to keep the old bound. `python -m backend.scheduling`
+    measures both sides of the trade.
+    """
+
+    def __init__(self, min_interval=1.0, max_interval=5.0, backoff=2.0, patience=3):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Need 0 < min_interval <= max_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.patience = patience
+        self.reset()
+
+    def reset(self):
+        self.interval = self.min_interval
+        self.stable_samples = 0
+
+    def next_interval(self, changed):
+        """Record whether the last sample saw a change and return the next sleep"""
+        if changed:
+            self.reset()
+        else:
+            self.stable_samples += 1
+            if self.stable_samples >= self.patience:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+        return self.interval
+
+    @property
+    def max_attribution_error(self):
+        return self.max_interval
+
+
+# now is the monotonic time at wake-up, elapsed the time since the previous
+# wake-up, gap whether that wake-up was so late the machine must have been
+# suspended (or the process frozen) in between.
+Tick = namedtuple("Tick", "now elapsed gap")
+
+
+class TickScheduler:
+    """Sleeps to absolute deadlines on a monotonic clock
+
+    Each wait targets the previous deadline plus the interval, so the time
+    spent doing a tick's work does not add up as drift, and wall-clock
+    adjustments cannot stretch or shrink a tick. Waking more than
+    `gap_threshold` seconds past the deadline is reported as a gap: the
+    caller should not credit that period to anything. Missed deadlines are
+    re-anchored to now instead of firing a burst of catch-up ticks.
+
+    `sleep` may be interruptible, like threading.Event.wait: when it
+    returns True the wait was cut short on purpose (stop, pause) and the
+    next interval starts from the moment of waking.
+
+    With `metrics` set, every wake-up's lateness goes into its "jitter"
+    histogram and gaps and overruns are counted there too.
+    """
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep, gap_threshold=15.0, metrics=None):
+        self.clock = clock
+        self.sleep = sleep
+        self.gap_threshold = gap_threshold
+        self.metrics = metrics
+        self.deadline = clock()
+        self.last_wake = self.deadline
+        self.gaps = 0
+        self.overruns = 0
+
+    def now(self):
+        return self.clock()
+
+    def reset(self):
+        self.deadline = self.last_wake = self.clock()
+
+    def is_gap(self, elapsed, expected):
+        return elapsed - expected > self.gap_threshold
+
+    def delay(self, interval):
+        """Advance the deadline by interval and return how long to sleep"""
+        self.deadline += interval
+        return max(0.0, self.deadline - self.clock())
+
+    def interrupted(self):
+        """The current wait was cut short: start the next interval from now"""
+        self.deadline = self.clock()
+
+    def woke(self, interval):
+        """Describe a wake-up that targeted the current deadline"""
+        now = self.clock()
+        late = now - self.deadline
+        gap = late > self.gap_threshold
+        if gap:
+            self.gaps += 1
+        elif late > interval:
+            self.overruns += 1
+        if self.metrics is not None:
+            self.metrics.observe("jitter", max(0.0, late))
+            if gap:
+                self.metrics.incr("gaps")
+            elif late > interval:
+                self.metrics.incr("overruns")
+        if late > interval:
+            self.deadline = now
+
+        elapsed = now - self.last_wake
+        self.last_wake = now
+        return Tick(now, elapsed, gap)
+
+    def wait(self, interval):
+        """Sleep until the next deadline and describe the wake-up"""
+        delay = self.delay(interval)
+        if delay > 0 and self.sleep(delay):
+            self.interrupted()
+        return self.woke(interval)
+
+
+class DayClock:
+    """Maps the tracker's monotonic timeline onto one calendar day
+
+    seconds(t) is the wall-clock time of monotonic t in seconds since local
+    midnight of date_str. Call resync() after a suspend, when the monotonic
+    clock may have stopped while the wall clock kept going.
+    """
+
+    def __init__(self, date_str, clock=time.monotonic, wall_clock=time.time):
+        self.date_str = date_str
+        self.base = datetime.strptime(date_str, "%Y-%m-%d").timestamp()
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.resync()
+
+    def resync(self):
+        self.offset = self.wall_clock() - self.clock()
+
+    def seconds(self, t):
+        return t + self.offset - self.base
+
+
+def replay_schedule(hours, seed=0):
+    """A random day: bursts of quick switches between long stretches in one app"""
+    rng = random.Random(seed)
+    apps = ["code.exe", "chrome.exe", "slack.exe", "outlook.exe", "explorer.exe", "teams.exe"]
+    schedule = []
+    elapsed = 0.0
+    while elapsed < hours * 3600:
+        if rng.random() < 0.7:
+            duration = rng.uniform(2, 30)
+        else:
+            duration = rng.uniform(300, 2400)
+        app = rng.choice(apps)
+        schedule.append((duration, app, f"{app} window"))
+        elapsed += duration
+    return schedule
+
+
+def replay(schedule, sampler):
+    """Sample a SyntheticProbe playing schedule on sampler's intervals
+
+    Returns (wakeups, totals) as an ActivityAccountant credits them.
+    """
+    from backend.accounting import ActivityAccountant
+    from backend.probes import SyntheticProbe
+
+    now = [0.0]
+    probe = SyntheticProbe(schedule, clock=lambda: now[0])
+    end = probe.duration
+    accountant = ActivityAccountant()
+    accountant.start(0.0)
+    wakeups = 0
+    while now[0] < end:
+        changed = accountant.observe(probe.snapshot(), now[0])
+        wakeups += 1
+        now[0] = min(now[0] + sampler.next_interval(changed), end)
+    return wakeups, accountant.settle(end)
+
+
+def bench(hours, max_interval, seed=0):
+    """Wake-ups per hour and attribution error, adaptive vs the fixed 1 s loop"""
+    schedule = replay_schedule(hours, seed)
+    truth = {}
+    for duration, app, _ in schedule:
+        truth[app] = truth.get(app, 0.0) + duration
+    total_hours = sum(truth.values()) / 3600
+    results = {}
+    for name, sampler in (("fixed_1s", AdaptiveInterval(1.0, 1.0)),
+                          ("adaptive", AdaptiveInterval(max_interval=max_interval))):
+        wakeups, totals = replay(schedule, sampler)
+        # Every misattributed second is missing from one app and extra in another
+        error = sum(abs(totals.get(app, 0.0) - truth.get(app, 0.0))
+                    for app in set(truth) | set(totals)) / 2
+        results[f"{name}_wakeups_per_hour"] = wakeups / total_hours
+        results[f"{name}_error_s_per_hour"] = error / total_hours
+    results["switches_per_hour"] = len(schedule) / total_hours
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark AdaptiveInterval against a fixed 1 s loop")
+    parser.add_argument("--hours", type=float, default=8)
+    parser.add_argument("--max-interval", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for key, value in bench(args.hours, args.max_interval, args.seed).items():
+        print(f"{key:>28}: {value:.1f}")
+
+
+if __name__ == "__main__":
+    main()
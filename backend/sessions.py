@@ -0,0 +1,164 @@
+import base64
+import sys
+from array import array
+from collections import namedtuple
+
+from backend.scheduling import DayClock
+
+# start/end are epoch seconds
+Session = namedtuple("Session", "start end app title")
+
+# Column typecodes: milliseconds since local midnight, interned app and
+# title ids. 14 bytes per interval, so 3000 switches take about 42 KB.
+COLUMNS = (("start", "I"), ("end", "I"), ("app", "H"), ("title", "I"))
+
+
+class SessionLog:
+    """One day's foreground intervals in array-backed columns
+
+    Every span of time credited to an app is recorded as (start, end,
+    app_id, title_id); a span that begins where the previous one for the
+    same app and title ended just extends it, so a session stays one row
+    however many ticks it lasts. App names and titles are interned.
+
+    record() takes times on the tracker's monotonic timeline; day_clock
+    places them on the day.
+    """
+
+    folder = "sessions"
+
+    def __init__(self, date_str, day_clock=None):
+        self.date_str = date_str
+        self.day_clock = day_clock or DayClock(date_str)
+        self.columns = {name: array(code) for name, code in COLUMNS}
+        self.count = 0
+        self.apps, self.app_ids = [], {}
+        self.titles, self.title_ids = [], {}
+        self.dirty = False
+
+    def resync_clock(self):
+        self.day_clock.resync()
+
+    def _intern(self, value, values, ids):
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+        return index
+
+    def _ms(self, t):
+        """Monotonic time -> ms since the day's local midnight"""
+        return max(0, int(round(self.day_clock.seconds(t) * 1000)))
+
+    def record(self, app, title, start, end):
+        """Record that app (with window title) was in front from start to end
+
+        A negative span (end < start) takes time back from the app's last
+        interval, as when idle is detected retroactively.
+        """
+        start_ms, end_ms = self._ms(start), self._ms(end)
+        app_id = self._intern(app, self.apps, self.app_ids)
+        title_id = self._intern(title or "", self.titles, self.title_ids)
+        columns = self.columns
+        last = self.count - 1
+
+        if end_ms < start_ms:
+            if last >= 0 and columns["app"][last] == app_id:
+                columns["end"][last] = max(columns["start"][last], end_ms)
+                self.dirty = True
+            return
+        if end_ms == start_ms:
+            return
+        if (last >= 0 and columns["end"][last] == start_ms
+                and columns["app"][last] == app_id and columns["title"][last] == title_id):
+            columns["end"][last] = end_ms
+        else:
+            # Fill start last: count only moves once the row is complete
+            columns["app"].append(app_id)
+            columns["title"].append(title_id)
+            columns["end"].append(end_ms)
+            columns["start"].append(start_ms)
+            self.count += 1
+        self.dirty = True
+
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+    # Queries
+
+    def sessions(self, app=None, min_length=0):
+        """Yield Session tuples in time order, optionally for one app"""
+        app_id = self.app_ids.get(app) if app is not None else None
+        if app is not None and app_id is None:
+            return
+        columns = self.columns
+        base = self.day_clock.base
+        for i in range(self.count):
+            if app_id is not None and columns["app"][i] != app_id:
+                continue
+            start, end = columns["start"][i], columns["end"][i]
+            if end - start < min_length * 1000:
+                continue
+            yield Session(base + start / 1000, base + end / 1000,
+                          self.apps[columns["app"][i]], self.titles[columns["title"][i]])
+
+    def stats(self):
+        """{app: {"sessions", "total", "mean", "longest"}} in seconds
+
+        Back-to-back rows of one app (title changes within it) count as a
+        single session.
+        """
+        result = {}
+        columns = self.columns
+        starts, ends, app_column = columns["start"], columns["end"], columns["app"]
+        run_length = 0.0
+        for i in range(self.count):
+            length = (ends[i] - starts[i]) / 1000
+            entry = result.setdefault(self.apps[app_column[i]],
+                                      {"sessions": 0, "total": 0.0, "longest": 0.0})
+            if i and app_column[i] == app_column[i - 1] and starts[i] == ends[i - 1]:
+                run_length += length
+            else:
+                entry["sessions"] += 1
+                run_length = length
+            entry["total"] += length
+            entry["longest"] = max(entry["longest"], run_length)
+        for entry in result.values():
+            entry["mean"] = entry["total"] / entry["sessions"]
+        return result
+
+    def switches(self):
+        """Number of times the foreground app changed"""
+        app_column = self.columns["app"]
+        return sum(1 for i in range(1, self.count) if app_column[i] != app_column[i - 1])
+
+    # Storage
+
+    def to_json(self):
+        count = self.count
+        encoded = {}
+        for name, code in COLUMNS:
+            column = self.columns[name][:count]
+            if sys.byteorder == "big":
+                column.byteswap()
+            encoded[name] = base64.b64encode(column.tobytes()).decode("ascii")
+        return {
+            "format": "timetracker-sessions", "date": self.date_str, "count": count,
+            "apps": self.apps[:], "titles": self.titles[:], "columns": encoded,
+        }
+
+    @classmethod
+    def from_json(cls, data, **kwargs):
+        log = cls(data["date"], **kwargs)
+        for name, code in COLUMNS:
+            column = array(code)
+            column.frombytes(base64.b64decode(data["columns"][name]))
+            if sys.byteorder == "big":
+                column.byteswap()
+            log.columns[name] = column
+        log.count = data["count"]
+        log.apps = list(data["apps"])
+        log.app_ids = {app: i for i, app in enumerate(log.apps)}
+        log.titles = list(data["titles"])
+        log.title_ids = {title: i for i, title in enumerate(log.titles)}
+        return log
@@ -0,0 +1,223 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from backend.clock import SYSTEM_CLOCK
+from backend.merge import load_device_id, export_store
+from backend.metrics import Metrics
+from backend.corrections import CorrectionLog
+from backend.fileio import read_json, write_atomic, write_json
+from backend.sessions import SessionLog
+from backend.titles import TitleStats
+from backend.hours import HourHistogram, weekday_hour_matrix
+from backend.scheduling import DayClock
+from backend.privacy import PrivacyMatcher
+from backend.resources import ResourceStats, ResourceSampler
+
+
+class DataManager:
+    """Handles saving and loading of time tracking data"""
+    
+    def __init__(self, data_dir=None, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.data_dir = Path(data_dir) if data_dir is not None else Path.home() / "TimeTracker"
+        self.data_dir.mkdir(exist_ok=True)
+        self.data_file = self.data_dir / "tracking_data.json"
+        self.privacy_file = self.data_dir / "privacy.json"
+        self.start_day()
+        self.device_id = load_device_id(self.data_dir)
+        self.metrics = Metrics("storage")
+        self.corrections = CorrectionLog(self.data_dir / "corrections.jsonl")
+        self._cache = None
+        self._cache_key = None
+        
+    def start_day(self):
+        """Make the clock's current date the day that saves go to"""
+        self.current_date = self.clock.now().strftime("%Y-%m-%d")
+        self._today_log_paths = {}
+        return self.current_date
+
+    def day_end(self):
+        """Epoch seconds of the local midnight that ends current_date"""
+        day = datetime.strptime(self.current_date, "%Y-%m-%d") + timedelta(days=1)
+        return day.timestamp()
+
+    def load_data(self):
+        """Load all tracking data from file
+
+        Every day is a fresh dict, so callers may change what they get back.
+        """
+        return {date_str: dict(day) for date_str, day in self._read_data().items()}
+
+    def _read_data(self):
+        """All tracking data, shared with the cache: read it, never change it"""
+        with self.metrics.timer("load_data"):
+            try:
+                if not self.data_file.exists():
+                    return {}
+                stat = self.data_file.stat()
+                cache_key = (stat.st_mtime_ns, stat.st_size)
+                if self._cache is not None and self._cache_key == cache_key:
+                    self.metrics.incr("cache_hits")
+                    return self._cache
+                self.metrics.incr("cache_misses")
+
+                with open(self.data_file, 'rb') as f:
+                    self.metrics.incr("file_opens")
+                    raw = f.read()
+                self.metrics.incr("bytes_read", len(raw))
+                with self.metrics.timer("parse"):
+                    data = json.loads(raw)
+                self.metrics.incr("parses")
+
+                self._cache, self._cache_key = data, cache_key
+                return data
+            except Exception as e:
+                print(f"Error loading data: {e}")
+                return {}
+
+    def save_data(self, all_data):
+        """Save all tracking data to file"""
+        with self.metrics.timer("save_data"):
+            try:
+                with self.metrics.timer("serialize"):
+                    raw = json.dumps(all_data, indent=2).encode("utf-8")
+                write_atomic(self.data_file, raw, self.metrics)
+                self.metrics.incr("bytes_written", len(raw))
+
+                stat = self.data_file.stat()
+                self._cache = {date_str: dict(day) for date_str, day in all_data.items()}
+                self._cache_key = (stat.st_mtime_ns, stat.st_size)
+            except Exception as e:
+                print(f"Error saving data: {e}")
+    
+    def get_today_data(self):
+        """Get today's tracking data"""
+        all_data = self._read_data()
+        return dict(all_data.get(self.current_date, {}))
+    
+    def save_today_data(self, app_times):
+        """Save today's tracking data"""
+        all_data = dict(self._read_data())
+        all_data[self.current_date] = dict(app_times)
+        self.save_data(all_data)
+    
+    def get_date_data(self, date_str):
+        """Get tracking data for specific date, with corrections applied"""
+        all_data = self._read_data()
+        return dict(self.corrections.apply(date_str, all_data.get(date_str, {})))
+
+    def get_range_data(self, start_date, end_date):
+        """Get corrected tracking data for every date in [start_date, end_date]"""
+        all_data = self._read_data()
+        return {
+            date_str: dict(self.corrections.apply(date_str, day_data))
+            for date_str, day_data in sorted(all_data.items())
+            if start_date <= date_str <= end_date
+        }
+    
+    # Per-day logs (sessions, titles, hours) live in their own folders,
+    # one JSON file per date, next to the totals
+
+    def day_log_path(self, kind, date_str):
+        if date_str != self.current_date:
+            return self.data_dir / kind.folder / f"{date_str}.json"
+        # Today's paths are built once, not on every save: building a Path
+        # interns its parts, and a churning intern table resizes (~1 MB)
+        path = self._today_log_paths.get(kind.folder)
+        if path is None:
+            path = self._today_log_paths[kind.folder] = self.data_dir / kind.folder / f"{date_str}.json"
+        return path
+
+    def get_day_log(self, kind, date_str, **kwargs):
+        """The `kind` log (SessionLog, TitleStats, HourHistogram) for date_str, or None"""
+        path = self.day_log_path(kind, date_str)
+        if not path.exists():
+            return None
+        try:
+            return kind.from_json(read_json(path), **kwargs)
+        except Exception as e:
+            print(f"Error loading {kind.folder}: {e}")
+            return None
+
+    def save_day_log(self, log):
+        """Flush a day log if anything was recorded since the last flush
+
+        Any log with folder, date_str, dirty and to_json() will do; it is
+        written atomically and read back by get_day_log() with from_json().
+        """
+        if not log.dirty:
+            return
+        try:
+            path = self.day_log_path(type(log), log.date_str)
+            path.parent.mkdir(exist_ok=True)
+            log.dirty = False
+            write_json(path, log.to_json())
+        except Exception as e:
+            print(f"Error saving {log.folder}: {e}")
+
+    def open_day_logs(self, clock=None):
+        """Today's logs, keyed by folder, continuing what was recorded earlier today
+
+        clock is the tracker's monotonic timeline (default: self.clock's).
+        """
+        date_str = self.current_date
+        day_clock = DayClock(date_str, clock or self.clock.monotonic, self.clock.time)
+        return {
+            "sessions": (self.get_day_log(SessionLog, date_str, day_clock=day_clock)
+                         or SessionLog(date_str, day_clock)),
+            "titles": self.get_day_log(TitleStats, date_str) or TitleStats(date_str),
+            "hours": (self.get_day_log(HourHistogram, date_str, day_clock=day_clock)
+                      or HourHistogram(date_str, day_clock)),
+        }
+
+    def get_sessions(self, date_str):
+        return self.get_day_log(SessionLog, date_str)
+
+    def get_titles(self, date_str):
+        return self.get_day_log(TitleStats, date_str)
+
+    def get_hours(self, date_str):
+        return self.get_day_log(HourHistogram, date_str)
+
+    def get_resources(self, date_str):
+        return self.get_day_log(ResourceStats, date_str)
+
+    def open_resource_stats(self):
+        """Today's ResourceStats, continuing what was sampled earlier today"""
+        return self.get_resources(self.current_date) or ResourceStats(self.current_date)
+
+    def open_resource_sampler(self, interval, **kwargs):
+        """ResourceSampler adding to today's ResourceStats"""
+        return ResourceSampler(self.open_resource_stats(), interval=interval, **kwargs)
+
+    def get_weekday_hours(self, start_date, end_date, app=None):
+        """7 x 24 array of seconds by weekday and hour over [start_date, end_date]"""
+        histograms = (self.get_hours(date_str) for date_str in sorted(self.get_all_dates())
+                      if start_date <= date_str <= end_date)
+        return weekday_hour_matrix((h for h in histograms if h is not None), app)
+
+    def load_privacy_rules(self):
+        """PrivacyMatcher from privacy.json, or the built-in browser rules"""
+        return PrivacyMatcher.load(self.privacy_file)
+
+    def get_all_dates(self):
+        """Get all dates with tracking data"""
+        return sorted(self._read_data(), reverse=True)
+
+    def compact(self):
+        """Fold recorded corrections into the stored data
+
+        Today is left in the correction log because the tracker keeps
+        rewriting it from its in-memory totals.
+        """
+        all_data = self.load_data()
+        self.corrections.compact(all_data, keep_dates={self.current_date})
+        self.save_data(all_data)
+
+    def export_store(self, out_dir):
+        """Export this device's data, corrections applied, for merging on another machine"""
+        out_path = Path(out_dir) / f"{self.device_id}.json"
+        dates = sorted(self._read_data())
+        corrected = self.get_range_data(dates[0], dates[-1]) if dates else {}
+        return export_store(corrected, self.device_id, out_path)
@@ -0,0 +1,176 @@
+import argparse
+import random
+import time
+
+
+class SpaceSaving:
+    """Approximate heaviest keys of a weighted stream in fixed memory
+
+    Keeps at most `capacity` counters (Metwally et al.'s Space-Saving).
+    A key not being tracked replaces the smallest counter and inherits its
+    count as its error. For every tracked key:
+
+        true weight <= estimate <= true weight + error
+
+    error never exceeds total / capacity, and any key whose true weight
+    is above total / capacity is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity=32):
+        self.capacity = capacity
+        self.counters = {}  # key -> [estimate, error]
+        self.total = 0.0
+
+    def add(self, key, weight=1.0):
+        if weight <= 0:
+            return
+        self.total += weight
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[key] = [weight, 0.0]
+            return
+        # Evict the smallest; O(capacity), and only for unseen keys
+        victim = min(self.counters, key=lambda k: self.counters[k][0])
+        floor = self.counters.pop(victim)[0]
+        self.counters[key] = [floor + weight, floor]
+
+    def remove(self, key, weight):
+        """Take weight back from key, e.g. time later found to be idle
+
+        The estimate is floored at its error: below that the counter can't
+        tell the key's own weight from what it inherited. An untracked key's
+        weight is already folded into the errors, so nothing changes.
+        """
+        counter = self.counters.get(key)
+        if counter is None or weight <= 0:
+            return
+        removed = min(weight, counter[0] - counter[1])
+        counter[0] -= removed
+        self.total -= removed
+
+    def max_error(self):
+        """Upper bound on the overcount of any estimate"""
+        if len(self.counters) < self.capacity:
+            return 0.0
+        return min(counter[0] for counter in self.counters.values())
+
+    def top(self, n=None):
+        """[(key, estimate, error)] heaviest first; true weight >= estimate - error"""
+        ranked = sorted(self.counters.items(), key=lambda item: item[1][0], reverse=True)
+        return [(key, estimate, error) for key, (estimate, error) in ranked[:n]]
+
+    def guaranteed(self, n=None):
+        """Keys certain to be in the true top: lower bound beats the next estimate"""
+        ranked = self.top()
+        result = []
+        for i, (key, estimate, error) in enumerate(ranked[:n]):
+            next_estimate = ranked[i + 1][1] if i + 1 < len(ranked) else self.max_error()
+            if estimate - error < next_estimate:
+                break
+            result.append(key)
+        return result
+
+    def to_json(self):
+        return {"capacity": self.capacity, "total": self.total,
+                "counters": [[key, estimate, error] for key, estimate, error in self.top()]}
+
+    @classmethod
+    def from_json(cls, data):
+        sketch = cls(data["capacity"])
+        sketch.total = data["total"]
+        sketch.counters = {key: [estimate, error] for key, estimate, error in data["counters"]}
+        return sketch
+
+
+class TitleStats:
+    """Approximate time per window title, capped at capacity titles per app"""
+
+    folder = "titles"
+
+    def __init__(self, date_str, capacity=32):
+        self.date_str = date_str
+        self.capacity = capacity
+        self.apps = {}
+        self.dirty = False
+
+    def add(self, app, title, seconds):
+        """Add seconds to (app, title); a negative amount takes time back"""
+        if not title or not seconds:
+            return
+        sketch = self.apps.get(app)
+        if seconds < 0:
+            if sketch is not None:
+                sketch.remove(title, -seconds)
+                self.dirty = True
+            return
+        if sketch is None:
+            sketch = self.apps[app] = SpaceSaving(self.capacity)
+        sketch.add(title, seconds)
+        self.dirty = True
+
+    def record(self, app, title, start, end):
+        self.add(app, title, end - start)
+
+    def resync_clock(self):
+        pass
+
+    def top(self, app, n=10):
+        """[(title, seconds, error)] for app, heaviest first"""
+        sketch = self.apps.get(app)
+        return sketch.top(n) if sketch is not None else []
+
+    def to_json(self):
+        return {"format": "timetracker-titles", "date": self.date_str, "capacity": self.capacity,
+                "apps": {app: sketch.to_json() for app, sketch in list(self.apps.items())}}
+
+    @classmethod
+    def from_json(cls, data):
+        stats = cls(data["date"], data["capacity"])
+        stats.apps = {app: SpaceSaving.from_json(sketch) for app, sketch in data["apps"].items()}
+        return stats
+
+
+def bench(events, distinct, capacity, heavy=8, seed=1):
+    """Feed a skewed stream of mostly one-off titles; return timing and accuracy"""
+    rng = random.Random(seed)
+    sketch = SpaceSaving(capacity)
+    truth = {}
+    start = time.perf_counter()
+    for _ in range(events):
+        if rng.random() < 0.3:
+            # A few titles get most of the time (the ones we care about)
+            title = f"heavy {rng.randrange(heavy)}"
+        else:
+            title = f"tab {rng.randrange(distinct)}"
+        weight = rng.uniform(0.5, 5.0)
+        sketch.add(title, weight)
+        if title.startswith("heavy"):
+            truth[title] = truth.get(title, 0.0) + weight
+    elapsed = time.perf_counter() - start
+
+    bound = sketch.total / capacity
+    worst = max((estimate - truth.get(key, 0.0) for key, estimate, error in sketch.top()
+                 if key in truth), default=0.0)
+    found = sum(1 for key in truth if key in sketch.counters)
+    return {
+        "events": events, "per_event_us": elapsed / events * 1e6, "counters": len(sketch.counters),
+        "heavy_found": f"{found}/{len(truth)}", "max_overcount": worst, "error_bound": bound,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the per-app title sketch")
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--distinct", type=int, default=1_000_000,
+                        help="number of distinct one-off titles in the stream")
+    parser.add_argument("--capacity", type=int, default=32)
+    args = parser.parse_args(argv)
+    for key, value in bench(args.events, args.distinct, args.capacity).items():
+        print(f"{key:>14}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Lets a plain `pytest` from the repo root import the backend package
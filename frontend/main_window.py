@@ -14,16 +14,20 @@ from PyQt6.QtGui import (
     QIcon, QPixmap, QPainter, QColor, QFont, QPalette, QAction,
     QLinearGradient, QPen, QBrush, QFontDatabase
 )
-from datetime import datetime
 from backend.tracker import BackendTracker
+from backend.idle import IDLE_APP
+from backend.accounting import TimesMirror
+from backend.clock import SYSTEM_CLOCK
 from frontend.widgets import StatusDot, CleanButton, CurrentActivityCard, AppUsageTable, StatsCard
 from frontend.widgets import HistoryWidget
 
 class TimeTrackerMainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, clock=None):
         super().__init__()
-        self.backend_tracker = BackendTracker()
+        self.clock = clock or SYSTEM_CLOCK
+        self.backend_tracker = BackendTracker(clock=self.clock)
         self.data_manager = self.backend_tracker.data_manager
+        self.times = TimesMirror()
         self.setup_backend_callbacks()
         self.setup_ui()
         self.setup_system_tray()
@@ -36,22 +40,63 @@ class TimeTrackerMainWindow(QMainWindow):
     def setup_backend_callbacks(self):
         self.backend_tracker.activity_changed.connect(self.on_activity_changed)
         self.backend_tracker.time_updated.connect(self.on_time_updated)
+        self.backend_tracker.times_changed.connect(self.on_times_changed)
         self.backend_tracker.status_changed.connect(self.on_status_changed)
 
     def on_activity_changed(self, app_name: str, window_title: str):
         self.current_activity.update_activity(app_name, window_title)
 
+    def on_times_changed(self, seq: int, changes):
+        if self.times.seq is not None and seq <= self.times.seq:
+            return  # already part of the last full copy
+        previous = [(app, self.times.app_times.get(app, 0)) for app, _ in changes]
+        if self.times.apply(seq, changes):
+            # Only what the delta touched: O(changes), not O(apps)
+            self.app_usage_table.apply_changes(changes)
+            self.apply_stat_changes(previous, changes)
+        else:
+            # Missed a delta (or not synced yet): start over from a full copy
+            self.times.reset(*self.backend_tracker.resync())
+            self.on_time_updated(self.times.app_times)
+
     def on_time_updated(self, app_times: dict):
         self.app_usage_table.update_app_times(app_times)
         self.update_stats(app_times)
-        self.history_widget.refresh_dates()
 
     def update_stats(self, app_times: dict):
+        """Recompute the stat cards' running totals from a full copy"""
         if not app_times:
             return
 
-        total_time = sum(app_times.values())
-        app_count = len([t for t in app_times.values() if t >= 1])
+        active_times = {app: t for app, t in app_times.items() if app != IDLE_APP}
+        self.active_total = sum(active_times.values())
+        self.active_apps = len([t for t in active_times.values() if t >= 1])
+        self.most_used = max(active_times, key=active_times.get) if active_times else None
+        self.show_stats()
+
+    def apply_stat_changes(self, previous, changes):
+        """Move the running totals by one delta; previous holds the old (app, total)s"""
+        if not hasattr(self, "active_total"):
+            self.update_stats(self.times.app_times)
+            return
+        app_times = self.times.app_times
+        rescan = False
+        for (app, old), (_, total) in zip(previous, changes):
+            if app == IDLE_APP:
+                continue
+            self.active_total += total - old
+            self.active_apps += (total >= 1) - (old >= 1)
+            if self.most_used is None or total > app_times.get(self.most_used, 0):
+                self.most_used = app
+            elif app == self.most_used and total < old:
+                rescan = True  # the leader lost time (idle taken back)
+        if rescan:
+            active_times = {app: t for app, t in app_times.items() if app != IDLE_APP}
+            self.most_used = max(active_times, key=active_times.get) if active_times else None
+        self.show_stats()
+
+    def show_stats(self):
+        total_time = self.active_total
 
         hours = int(total_time // 3600)
         minutes = int((total_time % 3600) // 60)
@@ -62,12 +107,10 @@ class TimeTrackerMainWindow(QMainWindow):
             total_time_str = f"{minutes:02d}:00"
 
         self.total_time_card.update_value(total_time_str)
-        self.apps_count_card.update_value(str(app_count))
+        self.apps_count_card.update_value(str(self.active_apps))
 
-        if app_times:
-            most_used = max(app_times.items(), key=lambda x: x[1])
-            most_used_name = self.get_display_name(most_used[0])
-            self.most_used_card.update_value(most_used_name)
+        if self.most_used is not None:
+            self.most_used_card.update_value(self.get_display_name(self.most_used))
 
     def get_display_name(self, process_name: str) -> str:
         name_map = {
@@ -190,7 +233,7 @@ class TimeTrackerMainWindow(QMainWindow):
         header_layout.addWidget(subtitle)
         layout.addLayout(header_layout)
 
-        self.current_activity = CurrentActivityCard()
+        self.current_activity = CurrentActivityCard(clock=self.clock)
         layout.addWidget(self.current_activity)
 
         self.control_button = CleanButton("Pause", variant="secondary")
@@ -285,7 +328,7 @@ class TimeTrackerMainWindow(QMainWindow):
         title.setFont(QFont("Inter", 36, QFont.Weight.Black))
         title.setStyleSheet("color: #000000;")
 
-        date_label = QLabel(datetime.now().strftime("%A, %B %d, %Y"))
+        date_label = QLabel(self.clock.now().strftime("%A, %B %d, %Y"))
         date_label.setFont(QFont("Inter", 18))
         date_label.setStyleSheet("color: #6b7280;")
 
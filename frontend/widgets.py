@@ -4,11 +4,12 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QPainter, QColor, QBrush, QFont, QPen
-import time
 import subprocess
 import os
 from datetime import datetime
 from typing import Dict
+from backend.idle import IDLE_APP
+from backend.clock import SYSTEM_CLOCK
 
 class AppLauncher:
     @staticmethod
@@ -162,11 +163,12 @@ class CleanButton(QPushButton):
 class CurrentActivityCard(QFrame):
     """Clean current activity display"""
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, clock=None):
         super().__init__(parent)
+        self.clock = clock or SYSTEM_CLOCK
         self.current_app = ""
         self.current_window = ""
-        self.start_time = time.time()
+        self.start_time = self.clock.monotonic()
         self.is_tracking = True
         self.accumulated_duration = 0
         self.setup_ui()
@@ -222,7 +224,7 @@ class CurrentActivityCard(QFrame):
         if app_name != self.current_app:
             self.current_app = app_name
             self.current_window = window_title
-            self.start_time = time.time()
+            self.start_time = self.clock.monotonic()
             self.accumulated_duration = 0
 
             display_name = self.get_display_name(app_name)
@@ -234,7 +236,7 @@ class CurrentActivityCard(QFrame):
 
     def update_duration(self):
         if self.is_tracking and self.current_app:
-            duration = self.accumulated_duration + (time.time() - self.start_time)
+            duration = self.accumulated_duration + (self.clock.monotonic() - self.start_time)
             self.duration_label.setText(self.format_time(duration))
 
     def set_tracking_status(self, status: str):
@@ -243,10 +245,10 @@ class CurrentActivityCard(QFrame):
         self.status_dot.set_status("active" if self.is_tracking else "paused")
         if self.is_tracking:
             if not was_tracking:
-                self.start_time = time.time()
+                self.start_time = self.clock.monotonic()
         else:
             if was_tracking:
-                self.accumulated_duration += time.time() - self.start_time
+                self.accumulated_duration += self.clock.monotonic() - self.start_time
 
     def get_display_name(self, process_name: str) -> str:
         name_map = {
@@ -279,9 +281,19 @@ class AppUsageTable(QTableWidget):
 
     app_launched = pyqtSignal(str)
 
+    # Every row's percentage moves with the total; they are refreshed on
+    # this period instead of on every delta
+    PERCENT_REFRESH_MS = 5000
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.app_times = {}
+        self.total_time = 0
+        self.order = []  # apps in row order
+        self.rows = {}   # app -> row
+        self.percent_timer = QTimer()
+        self.percent_timer.setSingleShot(True)
+        self.percent_timer.timeout.connect(self.refresh_percentages)
         self.setup_ui()
 
     def setup_ui(self):
@@ -377,17 +389,61 @@ class AppUsageTable(QTableWidget):
         return reverse_map.get(display_name, display_name.lower() + '.exe')
 
     def update_app_times(self, app_times):
-        self.app_times = app_times
+        self.app_times = dict(app_times)
+        self.total_time = sum(self.app_times.values())
         self.refresh_display()
 
+    def apply_changes(self, changes):
+        """Apply a delta ((app, total), ...), touching only the changed rows
+
+        Falls back to a full refresh when an app enters or leaves the table
+        or overtakes a neighbour.
+        """
+        for app, total in changes:
+            self.total_time += total - self.app_times.get(app, 0)
+            self.app_times[app] = total
+        for app, total in changes:
+            row = self.rows.get(app)
+            if row is None:
+                if total >= 1:
+                    self.refresh_display()
+                    return
+            elif total < 1 or not self._in_order(row, total):
+                self.refresh_display()
+                return
+        for app, total in changes:
+            row = self.rows.get(app)
+            if row is not None:
+                self.item(row, 2).setText(self.format_time(total))
+                self.item(row, 3).setText(self.format_percentage(total))
+        if not self.percent_timer.isActive():
+            self.percent_timer.start(self.PERCENT_REFRESH_MS)
+
+    def _in_order(self, row, total):
+        if row > 0 and self.app_times[self.order[row - 1]] < total:
+            return False
+        if row + 1 < len(self.order) and self.app_times[self.order[row + 1]] > total:
+            return False
+        return True
+
+    def format_percentage(self, time_spent):
+        percentage = (time_spent / self.total_time) * 100 if self.total_time > 0 else 0
+        return f"{percentage:.1f}%"
+
+    def refresh_percentages(self):
+        for row, app in enumerate(self.order):
+            self.item(row, 3).setText(self.format_percentage(self.app_times[app]))
+
     def refresh_display(self):
         if not self.app_times:
+            self.order, self.rows = [], {}
             self.setRowCount(0)
             return
 
-        total_time = sum(self.app_times.values())
         sorted_apps = sorted(self.app_times.items(), key=lambda x: x[1], reverse=True)
         filtered_apps = [(app, time_spent) for app, time_spent in sorted_apps if time_spent >= 1]
+        self.order = [app for app, _ in filtered_apps]
+        self.rows = {app: row for row, app in enumerate(self.order)}
 
         self.setRowCount(len(filtered_apps))
 
@@ -407,8 +463,7 @@ class AppUsageTable(QTableWidget):
             time_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
             self.setItem(row, 2, time_item)
 
-            percentage = (time_spent / total_time) * 100 if total_time > 0 else 0
-            percent_item = QTableWidgetItem(f"{percentage:.1f}%")
+            percent_item = QTableWidgetItem(self.format_percentage(time_spent))
             percent_item.setFont(QFont("Inter", 14))
             percent_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
             self.setItem(row, 3, percent_item)
@@ -612,8 +667,9 @@ class HistoryWidget(QWidget):
             self.hist_most_used_card.update_value("None")
             return
         
-        total_time = sum(app_times.values())
-        app_count = len([t for t in app_times.values() if t >= 1])
+        active_times = {app: t for app, t in app_times.items() if app != IDLE_APP}
+        total_time = sum(active_times.values())
+        app_count = len([t for t in active_times.values() if t >= 1])
         
         # Format total time
         hours = int(total_time // 3600)
@@ -628,8 +684,8 @@ class HistoryWidget(QWidget):
         self.hist_apps_count_card.update_value(str(app_count))
         
         # Most used app
-        if app_times:
-            most_used = max(app_times.items(), key=lambda x: x[1])
+        if active_times:
+            most_used = max(active_times.items(), key=lambda x: x[1])
             most_used_name = self.get_display_name(most_used[0])
             self.hist_most_used_card.update_value(most_used_name)
     
@@ -654,5 +710,14 @@ class HistoryWidget(QWidget):
         return name_map.get(process_name, process_name.replace('.exe', '').title())
     
     def refresh_dates(self):
-        """Refresh the available dates"""
+        """Refresh the available dates, keeping the selected one"""
+        selected = self.date_combo.currentData()
         self.load_available_dates()
+        index = self.date_combo.findData(selected) if selected else -1
+        if index > 0:
+            self.date_combo.setCurrentIndex(index)
+
+    def showEvent(self, event):
+        # New days (today, after midnight) show up whenever the tab is opened
+        super().showEvent(event)
+        self.refresh_dates()
@@ -0,0 +1,34 @@
+from backend.backup import BackupManager
+from backend.storage import DataManager
+
+DAY = "2024-01-02"
+
+
+def test_day_logs_are_backed_up_and_restored(tmp_path):
+    manager = DataManager(tmp_path)
+    manager.save_data({DAY: {"a.exe": 100}})
+    sessions = tmp_path / "sessions" / f"{DAY}.json"
+    sessions.parent.mkdir()
+    sessions.write_bytes(b'{"v": 1}')
+    backups = BackupManager(manager.data_file)
+
+    first = backups.backup()
+    assert list(first["day_logs"]) == [f"sessions/{DAY}.json"]
+    # Nothing changed: no new snapshot
+    assert backups.backup()["id"] == first["id"]
+
+    sessions.write_bytes(b'{"v": 2}')
+    later = tmp_path / "hours" / "2024-01-03.json"
+    later.parent.mkdir()
+    later.write_bytes(b"{}")
+    second = backups.backup()
+    assert second["id"] != first["id"]
+    assert second["written"] == 2
+
+    backups.restore(first["id"])
+    assert sessions.read_bytes() == b'{"v": 1}'
+    assert not later.exists()
+
+    backups.restore(second["id"], target=tmp_path / "copy" / "tracking_data.json")
+    assert (tmp_path / "copy" / "sessions" / f"{DAY}.json").read_bytes() == b'{"v": 2}'
+    assert (tmp_path / "copy" / "hours" / "2024-01-03.json").read_bytes() == b"{}"
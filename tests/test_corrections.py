@@ -0,0 +1,60 @@
+from backend.corrections import CorrectionLog
+from backend.storage import DataManager
+
+DAY = "2024-01-02"
+
+
+def test_adjust_adds_and_clamps_at_zero(tmp_path):
+    log = CorrectionLog(tmp_path / "corrections.jsonl")
+    log.adjust(DAY, "a.exe", 60)
+    log.adjust(DAY, "b.exe", -500)
+    assert log.apply(DAY, {"a.exe": 100, "b.exe": 200}) == {"a.exe": 160}
+    assert log.apply("2024-01-03", {"a.exe": 100}) == {"a.exe": 100}
+
+
+def test_reassign_moves_part_or_all(tmp_path):
+    log = CorrectionLog(tmp_path / "corrections.jsonl")
+    log.reassign(DAY, "a.exe", "b.exe", 30)
+    assert log.apply(DAY, {"a.exe": 100}) == {"a.exe": 70, "b.exe": 30}
+    log.reassign(DAY, "a.exe", "c.exe")
+    assert log.apply(DAY, {"a.exe": 100}) == {"b.exe": 30, "c.exe": 70}
+
+
+def test_reassign_never_moves_more_than_recorded(tmp_path):
+    log = CorrectionLog(tmp_path / "corrections.jsonl")
+    log.reassign(DAY, "a.exe", "b.exe", 500)
+    assert log.apply(DAY, {"a.exe": 100, "b.exe": 5}) == {"b.exe": 105}
+
+
+def test_delete_drops_app_and_leaves_input_untouched(tmp_path):
+    log = CorrectionLog(tmp_path / "corrections.jsonl")
+    log.delete(DAY, "a.exe")
+    day = {"a.exe": 100, "b.exe": 20}
+    assert log.apply(DAY, day) == {"b.exe": 20}
+    assert day == {"a.exe": 100, "b.exe": 20}
+    assert log.has_corrections(DAY)
+
+
+def test_log_survives_reopen(tmp_path):
+    CorrectionLog(tmp_path / "corrections.jsonl").adjust(DAY, "a.exe", 60)
+    assert CorrectionLog(tmp_path / "corrections.jsonl").apply(DAY, {"a.exe": 1}) == {"a.exe": 61}
+
+
+def test_compact_by_another_instance_is_not_applied_twice(tmp_path):
+    running = DataManager(tmp_path)
+    running.save_data({DAY: {"a.exe": 100}})
+    running.corrections.adjust(DAY, "a.exe", 60)
+    assert running.get_date_data(DAY) == {"a.exe": 160}
+
+    DataManager(tmp_path).compact()
+
+    assert not running.corrections.has_corrections(DAY)
+    assert running.get_date_data(DAY) == {"a.exe": 160}
+    assert running.get_range_data(DAY, DAY) == {DAY: {"a.exe": 160}}
+
+
+def test_corrections_from_another_instance_are_seen(tmp_path):
+    running = DataManager(tmp_path)
+    running.save_data({DAY: {"a.exe": 100}})
+    DataManager(tmp_path).corrections.delete(DAY, "a.exe")
+    assert running.get_date_data(DAY) == {}
@@ -0,0 +1,62 @@
+import tempfile
+from datetime import datetime
+
+from backend.accounting import ActivityAccountant
+from backend.clock import VirtualClock
+from backend.engine import TrackingEngine
+from backend.idle import IdleDetector, FakeIdleSource
+from backend.probes import ForegroundSnapshot, SyntheticProbe
+from backend.storage import DataManager
+
+
+def make_engine(tmp, **kwargs):
+    clock = VirtualClock()
+    return TrackingEngine(SyntheticProbe([(60, "code.exe", "main.py")], clock=clock.monotonic),
+                          data_manager=DataManager(tmp, clock=clock), hotkeys=False,
+                          save_interval=0, day_logs=False, clock=clock, **kwargs)
+
+
+def test_idle_detector_none_disables_idle(monkeypatch):
+    platform = IdleDetector(FakeIdleSource())
+    monkeypatch.setattr(IdleDetector, "default", classmethod(lambda cls: platform))
+    with tempfile.TemporaryDirectory() as tmp:
+        assert make_engine(tmp).idle_detector is platform
+        engine = make_engine(tmp, idle_detector=None)
+        assert engine.idle_detector is None
+        assert engine.accountant.idle_detector is None
+
+
+def test_day_rolls_over_at_midnight():
+    clock = VirtualClock(datetime(2024, 1, 1, 18, 0))
+    with tempfile.TemporaryDirectory() as tmp:
+        data_manager = DataManager(tmp, clock=clock)
+        engine = TrackingEngine(SyntheticProbe([(86400, "code.exe", "main.py")], clock=clock.monotonic),
+                                data_manager=data_manager, idle_detector=None, hotkeys=False,
+                                save_interval=0, clock=clock)
+        engine.start_tracking()
+        clock.sleep(10 * 3600)
+        assert engine.tracking_thread.is_alive()
+        engine.stop()
+
+        assert data_manager.current_date == "2024-01-02"
+        assert data_manager.get_date_data("2024-01-01") == {"code.exe": 6 * 3600}
+        assert data_manager.get_date_data("2024-01-02") == {"code.exe": 4 * 3600}
+        # The day logs split at midnight too, and agree with the totals
+        for date_str, seconds in (("2024-01-01", 6 * 3600), ("2024-01-02", 4 * 3600)):
+            assert data_manager.get_hours(date_str).hourly("code.exe").sum() == seconds
+            sessions = list(data_manager.get_sessions(date_str).sessions("code.exe"))
+            assert sum(s.end - s.start for s in sessions) == seconds
+
+
+def test_failing_recorder_does_not_stop_accounting():
+    class Broken:
+        folder = "broken"
+
+        def record(self, app, title, start, end):
+            raise OverflowError("unsigned int is greater than maximum")
+
+    accountant = ActivityAccountant(recorders=[Broken()])
+    accountant.start(0.0)
+    accountant.handle_snapshot(ForegroundSnapshot(1, "main.py", 10, "code.exe"), 0.0)
+    accountant.advance(5.0)
+    assert accountant.copy_times() == {"code.exe": 5.0}
@@ -0,0 +1,73 @@
+import os
+
+from backend.merge import MergedStore, export_store, merge_directory
+
+LAPTOP = {"2024-01-01": {"code.exe": 100}, "2024-01-02": {"code.exe": 50, "chrome.exe": 20}}
+DESKTOP = {"2024-01-02": {"code.exe": 30}, "2024-01-03": {"slack.exe": 10}}
+COMBINED = {
+    "2024-01-01": {"code.exe": 100},
+    "2024-01-02": {"code.exe": 80, "chrome.exe": 20},
+    "2024-01-03": {"slack.exe": 10},
+}
+
+
+def export(device_id, days):
+    return {"format": "timetracker-device-store", "device_id": device_id, "days": days}
+
+
+def test_merge_is_idempotent_and_order_independent():
+    forward = MergedStore()
+    for _ in range(2):
+        forward.merge_export(export("laptop", LAPTOP))
+        forward.merge_export(export("desktop", DESKTOP))
+    backward = MergedStore()
+    backward.merge_export(export("desktop", DESKTOP))
+    backward.merge_export(export("laptop", LAPTOP))
+    assert forward.combined_data() == backward.combined_data() == COMBINED
+
+
+def test_merge_state_survives_save_and_reload(tmp_path):
+    store = MergedStore(tmp_path / "merged.json")
+    store.merge_export(export("laptop", LAPTOP))
+    store.save()
+    reloaded = MergedStore(tmp_path / "merged.json")
+    assert reloaded.merge_export(export("laptop", LAPTOP)) == []
+    reloaded.merge_export(export("desktop", DESKTOP))
+    assert reloaded.combined_data() == COMBINED
+
+
+def test_unchanged_days_and_files_are_skipped(tmp_path, monkeypatch):
+    store = MergedStore()
+    assert sorted(store.merge_export(export("laptop", LAPTOP))) == ["2024-01-01", "2024-01-02"]
+    grown = dict(LAPTOP, **{"2024-01-02": {"code.exe": 60, "chrome.exe": 20}})
+    assert store.merge_export(export("laptop", grown)) == ["2024-01-02"]
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    path = export_store(DESKTOP, "desktop", shared / "desktop.json")
+    assert merge_directory(shared, store) == {"desktop.json": ["2024-01-02", "2024-01-03"]}
+
+    parsed = []
+    merge_export = MergedStore.merge_export
+    monkeypatch.setattr(MergedStore, "merge_export",
+                        lambda self, data: parsed.append(data) or merge_export(self, data))
+    assert merge_directory(shared, store) == {"desktop.json": []}
+    assert parsed == []  # same mtime and size: not even opened
+
+    export_store(dict(DESKTOP, **{"2024-01-03": {"slack.exe": 25}}), "desktop", path)
+    os.utime(path, ns=(1, 1))  # rewritten within the same timestamp tick
+    assert merge_directory(shared, store) == {"desktop.json": ["2024-01-03"]}
+    assert len(parsed) == 1
+
+
+def test_smaller_later_value_leaves_the_cell_unchanged():
+    # Documented limitation: merged cells only grow, so a correction that
+    # takes time off an already merged day does not reach the totals
+    store = MergedStore()
+    store.merge_export(export("laptop", LAPTOP))
+    corrected = {"2024-01-01": {"code.exe": 40}, "2024-01-02": {"chrome.exe": 20}}
+    assert store.merge_export(export("laptop", corrected)) == []
+    assert store.combined_data() == {
+        "2024-01-01": {"code.exe": 100},
+        "2024-01-02": {"code.exe": 50, "chrome.exe": 20},
+    }
@@ -0,0 +1,46 @@
+import tempfile
+from pathlib import Path
+
+from backend.clock import VirtualClock
+from backend.engine import TrackingEngine
+from backend.idle import IDLE_APP, IdleDetector, FakeIdleSource
+from backend.probes import SyntheticProbe
+from backend.replay import replay
+from backend.storage import DataManager
+
+
+def test_replay_matches_the_recorded_engine():
+    clock = VirtualClock()
+    idle_source = FakeIdleSource(clock.monotonic)
+
+    def work(seconds):
+        """Keep the user at the keyboard for `seconds`"""
+        for _ in range(int(seconds // 60)):
+            clock.sleep(60)
+            idle_source.touch()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "day.jsonl.gz"
+        probe = SyntheticProbe([(900, "code.exe", "main.py"),
+                                (600, "msedge.exe", "New InPrivate tab - Microsoft Edge"),
+                                (86400, "chrome.exe", "Docs")], clock=clock.monotonic)
+        engine = TrackingEngine(probe, data_manager=DataManager(tmp, clock=clock),
+                                idle_detector=IdleDetector(idle_source, threshold=300.0),
+                                hotkeys=False, save_interval=0, day_logs=False,
+                                record_to=path, clock=clock)
+        engine.start_tracking()
+        work(600)
+        engine.pause()
+        work(300)
+        engine.resume()
+        work(900)    # through the private window and on to chrome.exe
+        clock.sleep(900)  # away from the keyboard
+        idle_source.touch()
+        work(600)
+        engine.stop()
+
+        recorded = engine.accountant.copy_times()
+        assert set(recorded) == {"code.exe", "chrome.exe", IDLE_APP}
+        assert recorded["code.exe"] == 600  # the pause was not credited
+        assert recorded[IDLE_APP] == 900
+        assert replay(path).copy_times() == recorded
@@ -0,0 +1,128 @@
+import tempfile
+
+from backend.clock import VirtualClock
+from backend.engine import TrackingEngine
+from backend.idle import IdleDetector, FakeIdleSource
+from backend.metrics import Metrics
+from backend.probes import SyntheticProbe
+from backend.scheduling import TickScheduler
+from backend.storage import DataManager
+
+SUSPEND = 3600.0
+
+
+class FakeClock:
+    """Monotonic clock that only moves when slept on or told to"""
+
+    def __init__(self):
+        self.t = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.t += seconds
+
+
+def test_work_does_not_drift():
+    clock = FakeClock()
+    ticker = TickScheduler(clock=clock.monotonic, sleep=clock.sleep)
+    for _ in range(100):
+        clock.t += 0.3  # the tick's own work
+        tick = ticker.wait(1.0)
+        assert not tick.gap
+    # Deadlines are absolute: 100 ticks of 1 s end at 100 s, not 130 s
+    assert clock.t == 100.0
+    assert ticker.overruns == 0
+
+
+def test_clock_jump_reanchors_without_burst():
+    clock = FakeClock()
+    ticker = TickScheduler(clock=clock.monotonic, sleep=clock.sleep)
+    ticker.wait(1.0)
+    clock.t += 10.0  # frozen for a while, but under gap_threshold
+    tick = ticker.wait(1.0)
+    assert not tick.gap
+    assert ticker.overruns == 1
+    # The missed deadlines are not replayed as zero-length catch-up ticks
+    clock.sleeps.clear()
+    for _ in range(3):
+        ticker.wait(1.0)
+    assert clock.sleeps == [1.0, 1.0, 1.0]
+
+
+def test_suspend_is_a_gap():
+    clock = FakeClock()
+    metrics = Metrics("tick")
+    ticker = TickScheduler(clock=clock.monotonic, sleep=clock.sleep, metrics=metrics)
+    ticker.wait(1.0)
+    clock.t += SUSPEND
+    tick = ticker.wait(1.0)
+    assert tick.gap
+    assert tick.elapsed >= SUSPEND
+    assert ticker.gaps == 1
+    assert metrics.snapshot()["counters"]["gaps"] == 1
+    assert not ticker.wait(1.0).gap
+
+
+def test_interrupted_sleep_restarts_interval():
+    clock = FakeClock()
+
+    def sleep(seconds):
+        clock.t += seconds / 2
+        return True  # woken early, e.g. by pause
+
+    ticker = TickScheduler(clock=clock.monotonic, sleep=sleep)
+    ticker.wait(4.0)
+    assert clock.t == 2.0
+    assert ticker.deadline == 2.0
+
+
+def run_engine(seconds, suspend_at=None):
+    """Track one app on a VirtualClock, suspending once after suspend_at"""
+    clock = VirtualClock()
+    engine = None
+    suspended = []
+
+    def sleep(delay):
+        if suspend_at is not None and not suspended and clock.monotonic() >= suspend_at:
+            suspended.append(clock.monotonic())
+            clock.sleep(SUSPEND)  # the machine is asleep; nothing can wake it
+        return engine.sleep(delay)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = TrackingEngine(SyntheticProbe([(86400, "code.exe", "main.py")], clock=clock.monotonic),
+                                data_manager=DataManager(tmp, clock=clock),
+                                idle_detector=IdleDetector(FakeIdleSource(clock.monotonic),
+                                                           threshold=float("inf")),
+                                ticker=TickScheduler(clock=clock.monotonic, sleep=sleep),
+                                hotkeys=False, save_interval=0, day_logs=False, clock=clock)
+        engine.start_tracking()
+        clock.sleep(seconds)
+        engine.stop()
+    return engine
+
+
+def test_engine_tracks_wall_time():
+    engine = run_engine(1800)
+    assert abs(engine.app_times["code.exe"] - 1800) < 1e-6
+    assert engine.ticker.gaps == 0
+
+
+def test_engine_drops_suspend():
+    engine = run_engine(1800 + SUSPEND, suspend_at=600)
+    assert engine.ticker.gaps == 1
+    # The hour asleep is credited to nobody; at most the tick it hit is lost
+    tracked = engine.app_times["code.exe"]
+    max_interval = engine.sampler.max_interval
+    assert 1800 - max_interval <= tracked <= 1800
+
+
+def test_adaptive_interval_replay_bounds():
+    from backend.scheduling import bench
+    results = bench(hours=2, max_interval=5.0)
+    assert results["adaptive_wakeups_per_hour"] < results["fixed_1s_wakeups_per_hour"] / 2
+    # At most max_interval seconds go to the wrong app per switch
+    assert results["adaptive_error_s_per_hour"] <= 5.0 * results["switches_per_hour"]
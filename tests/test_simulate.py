@@ -0,0 +1,38 @@
+from backend.clock import simulate
+from backend.storage import DataManager
+
+
+def test_peak_memory_does_not_grow_with_days():
+    # Untraced warm-up: interpreter-wide tables (interned strings, caches)
+    # grow once per process, and would otherwise land in whichever traced
+    # run happens to cross their resize threshold
+    simulate(2.4)
+    short = simulate(1.2, trace_memory=True)
+    long = simulate(2.4, trace_memory=True)
+    assert long["gaps"] == 0
+    assert long["tracked_seconds"] > short["tracked_seconds"]
+    # A second day may reuse the first day's buffers, but must not add to them
+    assert long["peak_memory_kb"] <= short["peak_memory_kb"] * 1.25 + 64
+
+
+def test_save_cadence(monkeypatch):
+    saves = []
+    save_today_data = DataManager.save_today_data
+
+    def record(self, app_times):
+        saves.append(self.clock.monotonic())
+        save_today_data(self, app_times)
+
+    monkeypatch.setattr(DataManager, "save_today_data", record)
+    # 08:00 to 20:00: the working day, without a midnight day change
+    simulate(0.5, save_interval=60.0)
+
+    # Saves fall on the save_interval grid; the last one is the stop
+    periodic = saves[:-1]
+    assert periodic
+    for t in periodic:
+        assert abs(t / 60.0 - round(t / 60.0)) < 1e-6
+    # At most one per interval, and only while something is credited: nine
+    # hours of work with 4 of every 36 minutes away
+    assert len(set(periodic)) == len(periodic)
+    assert 9 * 60 * 32 / 36 - 15 <= len(periodic) <= 9 * 60 + 1
@@ -0,0 +1,53 @@
+import threading
+
+from backend.accounting import ActivityAccountant
+
+APPS = 500
+CREDITS = 20000
+READERS = 4
+
+
+def credit_ticks(readers):
+    """Credit CREDITS spans while `readers` threads spin on snapshot()
+
+    Returns the accountant's "accumulate" histogram and the reads done.
+    """
+    accountant = ActivityAccountant({f"app{i}.exe": float(i) for i in range(APPS)})
+    stop = threading.Event()
+    reads = []
+    errors = []
+
+    def read():
+        count = 0
+        last_seq = -1
+        while not stop.is_set():
+            seq, app_times = accountant.snapshot()
+            if seq < last_seq or len(app_times) != APPS:
+                errors.append((seq, last_seq, len(app_times)))
+            last_seq = seq
+            count += 1
+        reads.append(count)
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for i in range(CREDITS):
+            accountant.credit_span(f"app{i % APPS}.exe", accountant.last_time + 1.0)
+            accountant.last_time += 1.0
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert not errors
+    return accountant.metrics.snapshot()["histograms"]["accumulate"], sum(reads)
+
+
+def test_snapshot_readers_do_not_slow_ticks():
+    quiet, _ = credit_ticks(0)
+    loaded, reads = credit_ticks(READERS)
+    assert reads > CREDITS  # the readers really did contend with the writer
+    assert loaded["count"] == quiet["count"] == CREDITS
+    # Readers never take a lock the writer needs, so only the GIL is shared
+    assert loaded["p50_us"] <= 2 * quiet["p50_us"] + 5
+    assert loaded["p99_us"] <= 2 * quiet["p99_us"] + 20
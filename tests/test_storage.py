@@ -0,0 +1,14 @@
+from backend.storage import DataManager
+
+DAY = "2024-01-02"
+
+
+def test_changing_loaded_data_leaves_the_store_alone(tmp_path):
+    manager = DataManager(tmp_path)
+    manager.save_data({DAY: {"a.exe": 100}})
+    manager.load_data()[DAY]["a.exe"] = 999  # cache miss: fresh from disk
+    manager.load_data()[DAY]["a.exe"] = 999  # cache hit
+    manager.get_range_data(DAY, DAY)[DAY]["a.exe"] = 999
+    assert manager.load_data() == {DAY: {"a.exe": 100}}
+    assert manager.get_date_data(DAY) == {"a.exe": 100}
+    assert manager.get_range_data(DAY, DAY) == {DAY: {"a.exe": 100}}